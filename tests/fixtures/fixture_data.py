@@ -9,6 +9,7 @@ from posts.models import Post, Group
 def mock_media(settings):
     with tempfile.TemporaryDirectory() as temp_directory:
         settings.MEDIA_ROOT = temp_directory
+        settings.POST_THUMBNAILS_ASYNC = False
         yield temp_directory
 
 
@@ -0,0 +1,114 @@
+"""Кэш целых страниц для анонимных посетителей.
+
+Middleware стоит до сессий, аутентификации и CSRF: запрос без cookie
+сессии к представлению из ``PAGE_CACHE_VIEWS`` отдается из кэша, не
+проходя остальной стек. Ключ - путь и параметры ``page``/``cursor``,
+прочие параметры не плодят копии. Все ключи несут общее поколение:
+``invalidate()`` записывает новое, и старые страницы перестают читаться.
+
+Ответ помечен ``public`` с коротким ``s-maxage`` для CDN и
+``Vary: Cookie``, чтобы вошедшие пользователи не получили чужую
+страницу из промежуточного кэша.
+"""
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import Resolver404, resolve
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import parse_http_date_safe
+
+GENERATION_KEY = "anon-page:generation"
+KEY_PARAMS = ("page", "cursor")
+
+
+def generation():
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        value = uuid.uuid4().hex[:12]
+        if not cache.add(GENERATION_KEY, value, None):
+            value = cache.get(GENERATION_KEY, value)
+    return value
+
+
+def invalidate():
+    """Сбрасывает все закэшированные страницы."""
+    cache.set(GENERATION_KEY, uuid.uuid4().hex[:12], None)
+
+
+def page_key(request):
+    query = urlencode(
+        [
+            (name, request.GET[name])
+            for name in KEY_PARAMS
+            if name in request.GET
+        ]
+    )
+    digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return f"anon-page:{generation()}:{digest}"
+
+
+class AnonymousPageCacheMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def match(request):
+        """Совпадение URL, если запрос можно отдать из кэша."""
+        # В отладке в страницу встраивается панель django-debug-toolbar.
+        if request.method != "GET" or settings.DEBUG:
+            return None
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.view_name not in settings.PAGE_CACHE_VIEWS:
+            return None
+        return match
+
+    @staticmethod
+    def cacheable(response):
+        return response.status_code == 200 and not response.cookies
+
+    @staticmethod
+    def not_modified(request, response):
+        last_modified = response.get("Last-Modified")
+        return get_conditional_response(
+            request,
+            etag=response.get("ETag"),
+            last_modified=last_modified
+            and parse_http_date_safe(last_modified),
+            response=response,
+        )
+
+    def __call__(self, request):
+        match = self.match(request)
+        if match is None:
+            return self.get_response(request)
+        # Метрики и логи видят имя представления и при попадании.
+        request.resolver_match = match
+        key = page_key(request)
+        response = cache.get(key)
+        if response is not None:
+            return self.not_modified(request, response)
+        response = self.get_response(request)
+        if not self.cacheable(response):
+            return response
+        del response["Cache-Control"]
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=0,
+            s_maxage=settings.PAGE_CACHE_EDGE_SECONDS,
+        )
+        patch_vary_headers(response, ("Cookie",))
+        cache.set(key, response, settings.PAGE_CACHE_SECONDS)
+        return response
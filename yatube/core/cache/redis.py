@@ -0,0 +1,352 @@
+"""Кэш-бэкенд для Redis-совместимых серверов.
+
+Один общий кэш для всех процессов gunicorn вместо отдельного LocMemCache
+в каждом. Протокол RESP реализован здесь же, поэтому внешний клиент не
+нужен. Соединения переиспользуются через пул.
+
+    CACHES = {
+        "default": {
+            "BACKEND": "core.cache.redis.RedisCache",
+            "LOCATION": "redis://127.0.0.1:6379/0",
+            "OPTIONS": {"MAX_CONNECTIONS": 50, "SOCKET_TIMEOUT": 1},
+        }
+    }
+"""
+import pickle
+import socket
+import threading
+from urllib.parse import urlparse
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class RedisError(Exception):
+    pass
+
+
+class Connection:
+    """Одно TCP-соединение с разбором ответов RESP."""
+
+    def __init__(self, host, port, db=0, password=None, timeout=None):
+        self.timeout = timeout
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+        if password:
+            self.execute(b"AUTH", password)
+        if db:
+            self.execute(b"SELECT", db)
+
+    @staticmethod
+    def encode(*args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode()
+            elif isinstance(arg, int):
+                arg = b"%d" % arg
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Соединение закрыто сервером")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            return RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise RedisError(f"Неизвестный ответ: {line!r}")
+
+    def send(self, commands):
+        self.sock.sendall(b"".join(self.encode(*cmd) for cmd in commands))
+
+    def read_replies(self, count):
+        replies = [self.read_reply() for _ in range(count)]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def pipeline(self, commands):
+        """Отправляет команды одним пакетом и читает все ответы."""
+        self.send(commands)
+        return self.read_replies(len(commands))
+
+    def is_alive(self):
+        """Не закрыл ли сервер соединение, пока оно лежало в пуле."""
+        try:
+            self.sock.setblocking(False)
+            # Простаивающему соединению сервер ничего не присылает:
+            # пустой recv - закрытие, данные - рассинхронизация.
+            self.sock.recv(1, socket.MSG_PEEK)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            self.sock.settimeout(self.timeout)
+        return False
+
+    def execute(self, *args):
+        return self.pipeline([args])[0]
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ConnectionPool:
+    """Пул соединений с верхней границей их числа."""
+
+    def __init__(self, url, max_connections=50, timeout=None):
+        parsed = urlparse(url)
+        self.params = {
+            "host": parsed.hostname or "127.0.0.1",
+            "port": parsed.port or 6379,
+            "db": int(parsed.path.lstrip("/") or 0),
+            "password": parsed.password,
+            "timeout": timeout,
+        }
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_connections)
+
+    def idle_connection(self):
+        """Живое соединение из пула; закрытые сервером отбрасываются."""
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection = self.idle.pop()
+            if connection.is_alive():
+                return connection
+            connection.close()
+
+    def acquire(self):
+        if not self.slots.acquire(timeout=self.params["timeout"]):
+            raise RedisError("Пул соединений исчерпан")
+        connection = self.idle_connection()
+        if connection is not None:
+            return connection
+        try:
+            return Connection(**self.params)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, connection, broken=False):
+        if broken:
+            connection.close()
+        else:
+            with self.lock:
+                self.idle.append(connection)
+        self.slots.release()
+
+    def send(self, commands):
+        """Отправляет команды; неудачное подключение или отправку повторяет.
+
+        Сервер выполняет только полностью полученные команды, а обрыв
+        при отправке почти всегда значит, что соединение уже мертво.
+        """
+        for attempt in range(2):
+            try:
+                connection = self.acquire()
+            except OSError:
+                if attempt:
+                    raise
+                continue
+            try:
+                connection.send(commands)
+            except OSError:
+                self.release(connection, broken=True)
+                if attempt:
+                    raise
+                continue
+            return connection
+
+    def pipeline(self, commands):
+        """Выполняет команды одним пакетом.
+
+        Ошибка при чтении ответов не повторяется: сервер мог уже выполнить
+        команды, и повтор дважды применил бы INCRBY или SET NX.
+        """
+        connection = self.send(commands)
+        try:
+            replies = connection.read_replies(len(commands))
+        except Exception:
+            self.release(connection, broken=True)
+            raise
+        self.release(connection)
+        return replies
+
+    def disconnect(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(url, **options):
+    """Один пул на адрес сервера в пределах процесса."""
+    with _pools_lock:
+        if url not in _pools:
+            _pools[url] = ConnectionPool(url, **options)
+        return _pools[url]
+
+
+class RedisCache(BaseCache):
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.pool = get_pool(
+            server,
+            max_connections=options.get("MAX_CONNECTIONS", 50),
+            timeout=options.get("SOCKET_TIMEOUT"),
+        )
+
+    def make_key(self, key, version=None):
+        key = super().make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def serialize(value):
+        # Целые храним как есть, чтобы работали INCRBY/DECRBY.
+        if isinstance(value, int) and not isinstance(value, bool):
+            return b"%d" % value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def deserialize(data):
+        if data is None:
+            return None
+        try:
+            return int(data)
+        except ValueError:
+            return pickle.loads(data)
+
+    def expiry_args(self, timeout):
+        """Аргументы SET для таймаута; None - если ключ уже истек."""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return []
+        if timeout <= 0:
+            return None
+        return [b"PX", int(timeout * 1000)]
+
+    def execute(self, *args):
+        return self.pool.pipeline([args])[0]
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        expiry = self.expiry_args(timeout)
+        if expiry is None:
+            return False
+        return self.execute(
+            b"SET", key, self.serialize(value), *expiry, b"NX"
+        ) is not None
+
+    def get(self, key, default=None, version=None):
+        value = self.execute(b"GET", self.make_key(key, version=version))
+        if value is None:
+            return default
+        return self.deserialize(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        expiry = self.expiry_args(timeout)
+        if expiry is None:
+            self.execute(b"DEL", key)
+            return
+        self.execute(b"SET", key, self.serialize(value), *expiry)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        expiry = self.expiry_args(timeout)
+        if expiry is None:
+            return bool(self.execute(b"DEL", key))
+        if not expiry:
+            persisted, exists = self.pool.pipeline(
+                [(b"PERSIST", key), (b"EXISTS", key)]
+            )
+            return bool(persisted or exists)
+        return bool(self.execute(b"PEXPIRE", key, expiry[1]))
+
+    def delete(self, key, version=None):
+        self.execute(b"DEL", self.make_key(key, version=version))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        made = [self.make_key(key, version=version) for key in keys]
+        values = self.execute(b"MGET", *made)
+        return {
+            key: self.deserialize(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not data:
+            return []
+        expiry = self.expiry_args(timeout)
+        commands = []
+        for key, value in data.items():
+            key = self.make_key(key, version=version)
+            if expiry is None:
+                commands.append((b"DEL", key))
+            else:
+                commands.append((b"SET", key, self.serialize(value), *expiry))
+        self.pool.pipeline(commands)
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version=version) for key in keys]
+        if keys:
+            self.execute(b"DEL", *keys)
+
+    def has_key(self, key, version=None):
+        return bool(
+            self.execute(b"EXISTS", self.make_key(key, version=version))
+        )
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        exists, value = self.pool.pipeline(
+            [(b"EXISTS", key), (b"INCRBY", key, delta)]
+        )
+        if not exists:
+            self.execute(b"DEL", key)
+            raise ValueError(f"Key '{key}' not found")
+        return value
+
+    def clear(self):
+        self.execute(b"FLUSHDB")
+
+    def close(self, **kwargs):
+        # Соединения остаются в пуле между запросами.
+        pass
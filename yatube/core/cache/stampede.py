@@ -0,0 +1,31 @@
+"""Защита от «лавины» пересчетов при промахе кэша (dogpile).
+
+Когда ключ протух или инвалидирован, пересчитывает значение только тот
+процесс, который взял блокировку ``cache.add``; остальные недолго ждут
+готового значения и лишь потом, не дождавшись, считают сами.
+"""
+import time
+
+LOCK_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+WAIT_ATTEMPTS = 20
+
+
+def get_or_compute(cache, key, compute, timeout):
+    value = cache.get(key)
+    if value is not None:
+        return value
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+    for _ in range(WAIT_ATTEMPTS):
+        time.sleep(WAIT_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return compute()
@@ -0,0 +1,88 @@
+"""Действия, которые должны случиться только после коммита.
+
+Инвалидация кэша до коммита открывает окно, в котором соседний запрос
+читает старые строки и кладет их под новую версию ключа. С репликами
+то же окно длится, пока реплика не догонит основную базу: ленты с
+``@replica_reads`` заново наполнят кэш старыми строками. Поэтому при
+настроенных ``DATABASE_REPLICAS`` инвалидация повторяется через
+``REPLICA_STICKY_SECONDS`` - допустимое отставание реплики.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class Repeater:
+    """Один фоновый поток, который вызывает функции с задержкой.
+
+    Одинаковые вызовы (та же функция и аргументы) до срабатывания
+    склеиваются: частые инвалидации не множат ни потоки, ни записи.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.heap = []
+        self.due = {}
+        self.counter = itertools.count()
+        self.thread = None
+
+    def call_later(self, delay, func, *args):
+        key = (func, args)
+        with self.condition:
+            if key in self.due:
+                return
+            when = time.monotonic() + delay
+            self.due[key] = when
+            heapq.heappush(self.heap, (when, next(self.counter), key))
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="cache-repeat", daemon=True
+                )
+                self.thread.start()
+            self.condition.notify()
+
+    def next_key(self):
+        with self.condition:
+            while True:
+                timeout = None
+                if self.heap:
+                    timeout = self.heap[0][0] - time.monotonic()
+                    if timeout <= 0:
+                        _, _, key = heapq.heappop(self.heap)
+                        del self.due[key]
+                        return key
+                self.condition.wait(timeout)
+
+    def run(self):
+        while True:
+            func, args = self.next_key()
+            try:
+                func(*args)
+            except Exception:
+                logger.exception("Повторная инвалидация не удалась")
+
+
+repeater = Repeater()
+
+
+def invalidate(func, *args):
+    func(*args)
+    if settings.DATABASE_REPLICAS:
+        repeater.call_later(settings.REPLICA_STICKY_SECONDS, func, *args)
+
+
+def after_commit(func, *args):
+    """Вызывает ``func`` после коммита текущей транзакции.
+
+    Вне транзакции ``func`` вызывается сразу. При репликах вызов
+    повторяется, когда реплика гарантированно догнала запись.
+    """
+    transaction.on_commit(partial(invalidate, func, *args))
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+
+from . import routing
+
+STICKY_COOKIE = "primary_reads_until"
+
+
+class ReplicaRoutingMiddleware:
+    """Открывает клиенту окно чтения из основной базы после записи."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def sticky(self, request):
+        try:
+            until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            return False
+        return until > time.time()
+
+    def __call__(self, request):
+        routing.reset(sticky=self.sticky(request))
+        try:
+            response = self.get_response(request)
+            if routing.wrote():
+                window = settings.REPLICA_STICKY_SECONDS
+                response.set_cookie(
+                    STICKY_COOKIE,
+                    str(time.time() + window),
+                    max_age=window,
+                    httponly=True,
+                )
+            return response
+        finally:
+            routing.reset()
@@ -0,0 +1,72 @@
+"""Чтение с реплик для лент и запись в основную базу.
+
+По умолчанию все запросы идут в ``default``. Реплики включаются только
+внутри представлений, помеченных ``@replica_reads``, и только если у
+клиента не открыто «липкое» окно после собственной записи: так автор
+сразу видит свой пост, даже если реплика еще не догнала основную базу.
+Реплика выбирается одна на запрос: у реплик разное отставание, и
+запросы одной страницы не должны видеть разные моменты времени.
+
+    DATABASE_ROUTERS = ["core.db.routing.ReplicaRouter"]
+    DATABASE_REPLICAS = ["replica"]
+"""
+import random
+import threading
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY = "default"
+# Сессии всегда читаются из основной базы: пустая сессия с реплики
+# разлогинила бы пользователя.
+PRIMARY_APPS = {"sessions"}
+
+_state = threading.local()
+
+
+def reset(sticky=False):
+    _state.sticky = sticky
+    _state.replica = False
+    _state.wrote = False
+    _state.alias = None
+
+
+def wrote():
+    """Была ли запись в основную базу за текущий запрос."""
+    return getattr(_state, "wrote", False)
+
+
+def replica_reads(view):
+    """Разрешает представлению читать с реплик."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_state, "replica", False)
+        _state.replica = not getattr(_state, "sticky", False)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _state.replica = previous
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if model._meta.app_label in PRIMARY_APPS:
+            return PRIMARY
+        if replicas and getattr(_state, "replica", False):
+            alias = getattr(_state, "alias", None)
+            if alias not in replicas:
+                alias = _state.alias = random.choice(replicas)
+            return alias
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии основной базы, связи между ними допустимы.
+        return True
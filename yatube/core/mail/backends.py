@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import DatabaseError
+
+from . import outbox
+
+
+class OutboxBackend(BaseEmailBackend):
+    """Ставит письма в очередь ``OutboxEmail`` вместо отправки.
+
+    Письма с вложениями в очередь не попадают и уходят сразу через
+    ``OUTBOX_EMAIL_BACKEND``.
+    """
+
+    def send_messages(self, email_messages):
+        queued, direct = [], []
+        for message in email_messages:
+            (direct if message.attachments else queued).append(message)
+        sent = 0
+        try:
+            sent += outbox.enqueue(queued)
+        except DatabaseError:
+            if not self.fail_silently:
+                raise
+        if direct:
+            connection = get_connection(
+                settings.OUTBOX_EMAIL_BACKEND,
+                fail_silently=self.fail_silently,
+            )
+            sent += connection.send_messages(direct) or 0
+        return sent
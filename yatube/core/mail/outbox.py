@@ -0,0 +1,138 @@
+"""Очередь исходящих писем в базе.
+
+``OutboxBackend`` вместо отправки сохраняет письма в ``OutboxEmail``,
+поэтому задержка SMTP не входит во время ответа. Команда
+``send_outbox`` забирает созревшие письма пачками и отправляет их через
+одно открытое соединение бэкенда ``OUTBOX_EMAIL_BACKEND``. Письмо с
+ошибкой ждет повтора с растущей паузой и после ``OUTBOX_MAX_ATTEMPTS``
+попыток помечается недоставленным.
+
+Пачка забирается арендой: ``send_after`` сдвигается на
+``OUTBOX_LEASE_SECONDS``, и другие воркеры ее не видят. Если воркер
+упал посреди пачки, письма уйдут повторно после окончания аренды.
+"""
+import json
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.utils import timezone
+
+from core.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def serialize(message):
+    return json.dumps(
+        {
+            "subject": message.subject,
+            "body": message.body,
+            "from_email": message.from_email,
+            "to": message.to,
+            "cc": message.cc,
+            "bcc": message.bcc,
+            "reply_to": message.reply_to,
+            "headers": message.extra_headers,
+            "alternatives": getattr(message, "alternatives", []),
+        },
+        ensure_ascii=False,
+    )
+
+
+def deserialize(payload):
+    data = json.loads(payload)
+    alternatives = [tuple(item) for item in data.pop("alternatives")]
+    return EmailMultiAlternatives(alternatives=alternatives, **data)
+
+
+def enqueue(messages):
+    """Ставит письма в очередь; возвращает их число."""
+    OutboxEmail.objects.bulk_create(
+        OutboxEmail(
+            subject=message.subject,
+            recipients=", ".join(message.recipients()),
+            payload=serialize(message),
+        )
+        for message in messages
+    )
+    return len(messages)
+
+
+def claim(batch_size):
+    """Берет в аренду пачку писем, которым пора уйти."""
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    ids = list(
+        OutboxEmail.objects.filter(
+            status=OutboxEmail.PENDING, send_after__lte=now
+        )
+        .order_by("send_after", "pk")
+        .values_list("pk", flat=True)[:batch_size]
+    )
+    # Условие по send_after не даст двум воркерам взять одно письмо.
+    OutboxEmail.objects.filter(pk__in=ids, send_after__lte=now).update(
+        send_after=lease_until
+    )
+    return list(
+        OutboxEmail.objects.filter(
+            pk__in=ids, send_after=lease_until
+        ).order_by("pk")
+    )
+
+
+def mark_sent(email):
+    email.status = OutboxEmail.SENT
+    email.sent_at = timezone.now()
+    email.attempts += 1
+    email.last_error = ""
+    email.save(update_fields=["status", "sent_at", "attempts", "last_error"])
+
+
+def mark_failed(email, error):
+    """Откладывает письмо с экспоненциальной паузой или сдается."""
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+    else:
+        delay = settings.OUTBOX_RETRY_SECONDS * 2 ** (email.attempts - 1)
+        email.send_after = timezone.now() + timedelta(seconds=delay)
+    email.save(
+        update_fields=["status", "attempts", "last_error", "send_after"]
+    )
+
+
+def reset(connection):
+    """Закрывает соединение, которое после ошибки может быть разорвано."""
+    try:
+        connection.close()
+    except (smtplib.SMTPException, OSError):
+        pass
+
+
+def deliver(batch, connection):
+    """Отправляет пачку через одно соединение; (отправлено, ошибок).
+
+    Любая ошибка письма - и битый payload тоже - засчитывается как
+    попытка: иначе письмо вечно возвращалось бы в аренду, а остаток
+    пачки ждал бы ее окончания.
+    """
+    sent = failed = 0
+    for email in batch:
+        try:
+            # Открытое соединение переиспользуется, open() его не трогает.
+            connection.open()
+            connection.send_messages([deserialize(email.payload)])
+        except Exception as error:
+            if not isinstance(error, (smtplib.SMTPException, OSError)):
+                logger.exception("Письмо %s не отправлено", email.pk)
+            mark_failed(email, error)
+            failed += 1
+            reset(connection)
+        else:
+            mark_sent(email)
+            sent += 1
+    return sent, failed
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core.mail import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Отправляет письма из очереди пачками через одно соединение; "
+        "с --loop работает постоянно."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Не выходить, когда очередь пуста, а ждать новые письма.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Пауза между проверками пустой очереди, секунды.",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+        total_sent = total_failed = 0
+        try:
+            while True:
+                batch = outbox.claim(options["batch_size"])
+                if batch:
+                    sent, failed = outbox.deliver(batch, connection)
+                    total_sent += sent
+                    total_failed += failed
+                    continue
+                # Пока очередь пуста, соединение с SMTP не держим.
+                connection.close()
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        finally:
+            connection.close()
+        self.stdout.write(
+            f"Отправлено писем: {total_sent}, ошибок: {total_failed}"
+        )
@@ -0,0 +1,32 @@
+"""Кэш-бэкенды, считающие попадания и промахи для метрик."""
+from django.core.cache.backends import locmem
+
+from core.cache import redis
+
+from . import recorder
+
+_missing = object()
+
+
+class MetricsMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version=version)
+        if value is _missing:
+            recorder.record_cache(0, 1)
+            return default
+        recorder.record_cache(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        recorder.record_cache(len(found), len(keys) - len(found))
+        return found
+
+
+class LocMemCache(MetricsMixin, locmem.LocMemCache):
+    pass
+
+
+class RedisCache(MetricsMixin, redis.RedisCache):
+    pass
@@ -0,0 +1,46 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import recorder
+
+
+class MetricsMiddleware:
+    """Время ответа, запросы к базе, кэш и шаблоны по имени URL.
+
+    Меряются только представления из ``METRICS_NAMESPACES``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, "resolver_match", None)
+        if match is None or match.namespace not in settings.METRICS_NAMESPACES:
+            return None
+        return match.view_name
+
+    def __call__(self, request):
+        stats = recorder.start()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(recorder.query_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            recorder.stop()
+        view = self.view_name(request)
+        if view is not None:
+            recorder.flush(
+                view,
+                response.status_code,
+                time.perf_counter() - started,
+                stats,
+            )
+        return response
@@ -0,0 +1,92 @@
+"""Сбор показателей текущего запроса.
+
+Хуки кэша, базы и шаблонов пишут в поток запроса; middleware в конце
+одним захватом блокировки переносит итог в реестр. Вне запроса
+(команды, фоновые потоки) показатели не собираются.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from . import registry as metrics
+
+_local = threading.local()
+
+
+class RequestStats:
+    __slots__ = (
+        "queries", "query_seconds", "cache_hits", "cache_misses",
+        "template_seconds", "template_depth",
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_seconds = None
+        self.template_depth = 0
+
+
+def start():
+    _local.stats = RequestStats()
+    return _local.stats
+
+
+def stop():
+    _local.stats = None
+
+
+def current():
+    return getattr(_local, "stats", None)
+
+
+def record_cache(hits, misses):
+    stats = current()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+@contextmanager
+def template_render():
+    """Замер рендера; вложенные рендеры уже входят во внешний."""
+    stats = current()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    stats.template_depth += 1
+    try:
+        yield
+    finally:
+        stats.template_depth -= 1
+        if not stats.template_depth:
+            stats.template_seconds = (stats.template_seconds or 0) + (
+                time.perf_counter() - started
+            )
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """Обертка ``connection.execute_wrapper`` для счета запросов."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats = current()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += time.perf_counter() - started
+
+
+def flush(view, status, seconds, stats):
+    labels = (("view", view),)
+    with metrics.registry.lock:
+        metrics.requests_total.inc(labels + (("status", status),))
+        metrics.request_seconds.observe(labels, seconds)
+        metrics.db_queries_total.inc(labels, stats.queries)
+        metrics.db_seconds_total.inc(labels, stats.query_seconds)
+        metrics.cache_hits_total.inc(labels, stats.cache_hits)
+        metrics.cache_misses_total.inc(labels, stats.cache_misses)
+        if stats.template_seconds is not None:
+            metrics.template_seconds.observe(labels, stats.template_seconds)
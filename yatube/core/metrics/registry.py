@@ -0,0 +1,127 @@
+"""Счетчики и гистограммы процесса в формате Prometheus.
+
+Метрики живут в памяти процесса: каждый воркер gunicorn отдает свои, а
+суммирует их Prometheus. Запись - одно обновление словаря под общей
+блокировкой, без внешних зависимостей.
+"""
+import bisect
+import threading
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+
+    def inc(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, labels, value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, labels, value):
+        counts, total = self.values.get(
+            labels, ([0] * (len(self.buckets) + 1), 0.0)
+        )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.values[labels] = (counts, total + value)
+
+    def samples(self):
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    labels + (("le", bound),),
+                    cumulative,
+                )
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text):
+        return self.add(Counter(name, help_text))
+
+    def histogram(self, name, help_text, **kwargs):
+        return self.add(Histogram(name, help_text, **kwargs))
+
+    def clear(self):
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.values.clear()
+
+    def render(self):
+        """Текстовый формат экспозиции Prometheus 0.0.4."""
+        lines = []
+        with self.lock:
+            for metric in self.metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for name, labels, value in metric.samples():
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+requests_total = registry.counter(
+    "yatube_requests_total", "Запросы по представлению и статусу."
+)
+request_seconds = registry.histogram(
+    "yatube_request_duration_seconds", "Время ответа представления."
+)
+db_queries_total = registry.counter(
+    "yatube_db_queries_total", "Запросы к базе данных."
+)
+db_seconds_total = registry.counter(
+    "yatube_db_query_seconds_total", "Суммарное время запросов к базе."
+)
+cache_hits_total = registry.counter(
+    "yatube_cache_hits_total", "Попадания в кэш."
+)
+cache_misses_total = registry.counter(
+    "yatube_cache_misses_total", "Промахи кэша."
+)
+template_seconds = registry.histogram(
+    "yatube_template_render_seconds", "Время рендера шаблона ответа."
+)
@@ -0,0 +1,23 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .registry import registry
+
+
+def authorized(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        return False
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    return hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+
+
+def metrics(request):
+    """Метрики процесса для Prometheus; только с токеном METRICS_TOKEN."""
+    if not authorized(request):
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class CreatedModel(models.Model):
@@ -8,3 +9,40 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class OutboxEmail(CreatedModel):
+    """Письмо в очереди на отправку; его отправляет send_outbox."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (SENT, "Отправлено"),
+        (FAILED, "Не доставлено"),
+    )
+
+    subject = models.TextField("Тема")
+    recipients = models.TextField("Получатели")
+    # JSON с полями EmailMessage, из которых письмо собирается заново.
+    payload = models.TextField("Письмо")
+    status = models.CharField(
+        "Статус", max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    send_after = models.DateTimeField("Отправить после", default=timezone.now)
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+
+    class Meta:
+        verbose_name = "Письмо в очереди"
+        verbose_name_plural = "Очередь писем"
+        indexes = [
+            models.Index(
+                fields=["status", "send_after"], name="core_outbox_due"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipients}"
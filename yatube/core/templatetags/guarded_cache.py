@@ -0,0 +1,43 @@
+from django import template
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.templatetags.cache import CacheNode, do_cache
+
+from core.cache.stampede import get_or_compute
+
+register = template.Library()
+
+
+class GuardedCacheNode(CacheNode):
+    """{% cache %}, в котором промах пересчитывает только один процесс."""
+
+    def render(self, context):
+        expire_time = self.expire_time_var.resolve(context)
+        if expire_time is not None:
+            expire_time = int(expire_time)
+        if self.cache_name:
+            fragment_cache = caches[self.cache_name.resolve(context)]
+        else:
+            try:
+                fragment_cache = caches["template_fragments"]
+            except InvalidCacheBackendError:
+                fragment_cache = caches["default"]
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return get_or_compute(
+            fragment_cache,
+            make_template_fragment_key(self.fragment_name, vary_on),
+            lambda: self.nodelist.render(context),
+            expire_time,
+        )
+
+
+@register.tag("cache")
+def do_guarded_cache(parser, token):
+    node = do_cache(parser, token)
+    return GuardedCacheNode(
+        node.nodelist,
+        node.expire_time_var,
+        node.fragment_name,
+        node.vary_on,
+        node.cache_name,
+    )
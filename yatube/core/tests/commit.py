@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+@contextmanager
+def run_commit_hooks(using=DEFAULT_DB_ALIAS):
+    """Выполняет on_commit-колбэки блока, как при коммите транзакции.
+
+    ``TestCase`` откатывает тест целиком и колбэки не вызывает; здесь
+    они запускаются в конце блока, как ``captureOnCommitCallbacks``
+    из Django 3.2.
+    """
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    try:
+        yield
+    finally:
+        while len(connection.run_on_commit) > start:
+            _, callback = connection.run_on_commit.pop(start)
+            callback()
@@ -0,0 +1,162 @@
+"""Минимальный Redis-совместимый сервер для тестов кэш-бэкенда."""
+import socket
+import socketserver
+import threading
+import time
+
+
+class Store:
+    """Данные сервера; метод cmd_<имя> выполняет команду <ИМЯ>."""
+
+    def __init__(self):
+        self.data = {}
+        self.deadlines = {}
+        self.lock = threading.Lock()
+
+    def alive(self, key):
+        deadline = self.deadlines.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.deadlines.pop(key, None)
+        return key in self.data
+
+    def execute(self, command, args):
+        handler = getattr(self, f"cmd_{command.decode().lower()}", None)
+        if handler is None:
+            raise ValueError(f"unknown command {command!r}")
+        return handler(*args)
+
+    def cmd_ping(self, *args):
+        return "OK"
+
+    cmd_select = cmd_auth = cmd_ping
+
+    def cmd_flushdb(self):
+        self.data.clear()
+        self.deadlines.clear()
+        return "OK"
+
+    def cmd_get(self, key):
+        return self.data[key] if self.alive(key) else None
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        upper = [option.upper() for option in options]
+        if b"NX" in upper and self.alive(key):
+            return None
+        self.data[key] = value
+        self.deadlines.pop(key, None)
+        if b"PX" in upper:
+            self.cmd_pexpire(key, options[upper.index(b"PX") + 1])
+        return "OK"
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.alive(key)
+            self.data.pop(key, None)
+            self.deadlines.pop(key, None)
+        return removed
+
+    def cmd_exists(self, *keys):
+        return sum(self.alive(key) for key in keys)
+
+    def cmd_incrby(self, key, delta):
+        value = int(self.data[key]) if self.alive(key) else 0
+        value += int(delta)
+        self.data[key] = b"%d" % value
+        return value
+
+    def cmd_pexpire(self, key, milliseconds):
+        if not self.alive(key):
+            return 0
+        self.deadlines[key] = time.monotonic() + int(milliseconds) / 1000
+        return 1
+
+    def cmd_persist(self, key):
+        return int(
+            self.alive(key) and self.deadlines.pop(key, None) is not None
+        )
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, str):
+            return b"+%s\r\n" % value.encode()
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(
+                self.reply(item) for item in value
+            )
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        store = self.server.store
+        self.server.clients.add(self.connection)
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            self.server.commands.append(args[0].upper())
+            with store.lock:
+                try:
+                    data = self.reply(store.execute(args[0], args[1:]))
+                except Exception as error:
+                    data = b"-ERR %s\r\n" % str(error).encode()
+            if self.server.drop_replies:
+                # Команда выполнена, но ответ теряется вместе с соединением.
+                self.server.drop_replies -= 1
+                return
+            self.wfile.write(data)
+
+    def finish(self):
+        self.server.clients.discard(self.connection)
+        super().finish()
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    """Запускается в фоновом потоке на свободном порту 127.0.0.1."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RespHandler)
+        self.store = Store()
+        self.commands = []
+        self.clients = set()
+        self.drop_replies = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def disconnect_clients(self):
+        """Закрывает открытые соединения, как при перезапуске сервера."""
+        for client in list(self.clients):
+            client.shutdown(socket.SHUT_RDWR)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,89 @@
+"""Минимальный SMTP-сервер для тестов очереди писем."""
+import socketserver
+import threading
+from email import message_from_bytes, policy
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def send(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if line in (b".\r\n", b""):
+                return b"".join(lines)
+            # Точка в начале строки экранируется удвоением.
+            lines.append(line[1:] if line.startswith(b"..") else line)
+
+    def handle(self):
+        server = self.server
+        self.send("220 localhost test SMTP")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.send("250 localhost")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1], []
+                self.send("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip("<> "))
+                self.send("250 OK")
+            elif verb == "DATA":
+                self.send("354 End data with <CR><LF>.<CR><LF>")
+                data = self.read_data()
+                with server.lock:
+                    if server.failures:
+                        server.failures -= 1
+                        self.send("451 Temporary failure")
+                        continue
+                    message = message_from_bytes(data, policy=policy.default)
+                    server.messages.append((sender, recipients, message))
+                self.send("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                self.send("250 OK")
+            elif verb == "QUIT":
+                self.send("221 Bye")
+                return
+            else:
+                self.send("502 Command not implemented")
+
+
+class SmtpServer(socketserver.ThreadingTCPServer):
+    """Принимает письма на свободном порту 127.0.0.1.
+
+    ``failures`` - сколько следующих писем отклонить временной ошибкой.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SmtpHandler)
+        self.lock = threading.Lock()
+        self.messages = []
+        self.failures = 0
+        self.connections = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
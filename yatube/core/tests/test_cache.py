@@ -0,0 +1,129 @@
+import threading
+import time
+
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.cache.redis import RedisCache
+from core.cache.stampede import get_or_compute
+from .resp_server import RespServer
+
+
+class RespServerMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = RespServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cache = RedisCache(self.server.url, {})
+        self.cache.clear()
+
+
+class RedisCacheTest(RespServerMixin, SimpleTestCase):
+    def test_get_set_delete(self):
+        self.cache.set("key", {"a": 1})
+        self.assertEqual(self.cache.get("key"), {"a": 1})
+        self.assertFalse(self.cache.add("key", "other"))
+        self.assertTrue(self.cache.add("new", "value"))
+        self.cache.delete("key")
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(self.cache.get("key", "default"), "default")
+
+    def test_many_and_incr(self):
+        self.cache.set_many({"a": 1, "b": "two"})
+        self.assertEqual(
+            self.cache.get_many(["a", "b", "c"]), {"a": 1, "b": "two"}
+        )
+        self.assertEqual(self.cache.incr("a", 5), 6)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+        self.assertFalse(self.cache.has_key("missing"))
+        self.cache.delete_many(["a", "b"])
+        self.assertEqual(self.cache.get_many(["a", "b"]), {})
+
+    def test_timeout(self):
+        self.cache.set("short", "value", 0.05)
+        self.cache.set("gone", "value", 0)
+        self.assertIsNone(self.cache.get("gone"))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("short"))
+
+    def test_connections_reused(self):
+        """Последовательные команды идут через одно соединение пула."""
+
+        for i in range(20):
+            self.cache.set(f"key-{i}", i)
+        self.assertEqual(len(self.cache.pool.idle), 1)
+
+    def test_stale_connection_replaced(self):
+        """Соединение, закрытое сервером в пуле, заменяется новым."""
+
+        self.cache.set("key", 1)
+        self.server.disconnect_clients()
+        self.assertEqual(self.cache.get("key"), 1)
+
+    def test_lost_reply_not_retried(self):
+        """Без ответа команда не повторяется: INCR не применится дважды."""
+
+        self.cache.set("counter", 1)
+        key = self.cache.make_key("counter")
+        self.server.commands.clear()
+        self.server.drop_replies = 1
+        with self.assertRaises(ConnectionError):
+            self.cache.execute(b"INCRBY", key, 1)
+        self.assertEqual(self.server.commands, [b"INCRBY"])
+        self.assertEqual(self.cache.get("counter"), 2)
+
+
+class StampedeTest(RespServerMixin, SimpleTestCase):
+    def test_value_computed_once(self):
+        """Одновременный промах пересчитывает значение один раз."""
+
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    get_or_compute(self.cache, "feed", compute, 60)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+
+class SharedCacheFeedTest(RespServerMixin, TestCase):
+    def test_feed_fragments_in_shared_cache(self):
+        """Фрагменты ленты попадают в общий кэш."""
+
+        settings = {
+            "default": {
+                "BACKEND": "core.cache.redis.RedisCache",
+                "LOCATION": self.server.url,
+            }
+        }
+        with override_settings(CACHES=settings):
+            response = Client().get(reverse("posts:index"))
+        self.assertEqual(response.status_code, 200)
+        keys = list(self.server.store.data)
+        self.assertTrue(
+            any(b"template.cache.index_page" in key for key in keys)
+        )
+        self.assertTrue(any(b"feed-version:global" in key for key in keys))
@@ -0,0 +1,68 @@
+import re
+
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics.registry import Registry, registry
+
+
+class RegistryTest(SimpleTestCase):
+    def test_prometheus_text(self):
+        """Гистограмма отдается накопительными бакетами."""
+
+        metrics = Registry()
+        latency = metrics.histogram("latency", "Время.", buckets=(0.1, 1))
+        latency.observe((("view", "a"),), 0.05)
+        latency.observe((("view", "a"),), 0.5)
+        text = metrics.render()
+        self.assertIn("# TYPE latency histogram", text)
+        self.assertIn('latency_bucket{view="a",le="0.1"} 1', text)
+        self.assertIn('latency_bucket{view="a",le="+Inf"} 2', text)
+        self.assertIn('latency_count{view="a"} 2', text)
+
+
+# Страница из кэша гостей не рендерит шаблон; меряем полный путь.
+@override_settings(PAGE_CACHE_VIEWS=(), METRICS_TOKEN="secret")
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        cache.clear()
+        self.client = Client()
+
+    def value(self, text, name, view="posts:index"):
+        match = re.search(
+            rf'^{name}{{view="{view}"[^}}]*}} (\S+)$', text, re.M
+        )
+        self.assertIsNotNone(match, f"{name} не найдена")
+        return float(match.group(1))
+
+    def test_view_metrics_exposed(self):
+        """Запросы, база, кэш и шаблоны учтены по имени URL."""
+
+        self.client.get(reverse("posts:index"))
+        self.client.get(reverse("posts:index"))
+        text = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        ).content.decode()
+        self.assertIn(
+            'yatube_requests_total{view="posts:index",status="200"} 2', text
+        )
+        self.assertGreater(self.value(text, "yatube_db_queries_total"), 0)
+        self.assertGreater(self.value(text, "yatube_cache_hits_total"), 0)
+        self.assertGreater(self.value(text, "yatube_cache_misses_total"), 0)
+        self.assertEqual(
+            self.value(text, "yatube_template_render_seconds_count"), 2
+        )
+        self.assertNotIn('view="metrics"', text)
+
+    def test_endpoint_requires_token(self):
+        """Локальный адрес не дает доступа: за прокси он у всех."""
+
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 404)
+        with self.settings(METRICS_TOKEN=""):
+            response = self.client.get(url, HTTP_AUTHORIZATION="Bearer ")
+            self.assertEqual(response.status_code, 404)
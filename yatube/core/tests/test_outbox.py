@@ -0,0 +1,141 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.mail import outbox
+from core.models import OutboxEmail
+from .smtp_server import SmtpServer
+
+User = get_user_model()
+
+
+class SmtpServerMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = SmtpServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.messages.clear()
+        self.server.failures = 0
+        self.server.connections = 0
+        smtp = override_settings(
+            EMAIL_BACKEND="core.mail.backends.OutboxBackend",
+            OUTBOX_EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=self.server.port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+        )
+        smtp.enable()
+        self.addCleanup(smtp.disable)
+
+    def send_outbox(self):
+        call_command("send_outbox", stdout=StringIO())
+
+
+class OutboxTest(SmtpServerMixin, TestCase):
+    def test_password_reset_queued(self):
+        """Сброс пароля не ходит в SMTP, письмо уходит воркером."""
+
+        User.objects.create_user(
+            username="auth", email="auth@example.com", password="secret-pass"
+        )
+        response = Client().post(
+            reverse("users:password_reset_form"),
+            {"email": "auth@example.com"},
+        )
+        self.assertRedirects(response, reverse("users:password_reset_done"))
+        self.assertEqual(self.server.connections, 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.recipients, "auth@example.com")
+
+        self.send_outbox()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.SENT)
+        self.assertIsNotNone(email.sent_at)
+        (sender, recipients, message), = self.server.messages
+        self.assertEqual(recipients, ["auth@example.com"])
+        self.assertEqual(message["Subject"], email.subject)
+        self.assertIn("/reset/", message.get_payload(decode=True).decode())
+
+    def test_batch_uses_one_connection(self):
+        mail.send_mass_mail(
+            [(f"Тема {i}", "Текст", None, [f"u{i}@example.com"])
+             for i in range(5)]
+        )
+        self.assertEqual(OutboxEmail.objects.count(), 5)
+        self.send_outbox()
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertFalse(
+            OutboxEmail.objects.exclude(status=OutboxEmail.SENT).exists()
+        )
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_retry_with_backoff(self):
+        """Временная ошибка откладывает письмо, затем оно уходит."""
+
+        mail.send_mail("Первое", "Текст", None, ["a@example.com"])
+        mail.send_mail("Второе", "Текст", None, ["b@example.com"])
+        self.server.failures = 1
+        self.send_outbox()
+        failed = OutboxEmail.objects.get(subject="Первое")
+        self.assertEqual(failed.status, OutboxEmail.PENDING)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("SMTPDataError", failed.last_error)
+        self.assertGreater(failed.send_after, timezone.now())
+        self.assertEqual(
+            OutboxEmail.objects.get(subject="Второе").status,
+            OutboxEmail.SENT,
+        )
+
+        OutboxEmail.objects.filter(pk=failed.pk).update(
+            send_after=timezone.now()
+        )
+        self.server.failures = 1
+        self.send_outbox()
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, OutboxEmail.FAILED)
+        self.assertEqual(failed.attempts, 2)
+        self.assertEqual(len(self.server.messages), 1)
+
+    def test_claimed_batch_hidden_from_other_workers(self):
+        for i in range(3):
+            mail.send_mail(f"Тема {i}", "Текст", None, ["a@example.com"])
+        first = outbox.claim(2)
+        second = outbox.claim(2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({email.pk for email in first} & {second[0].pk})
+        self.assertEqual(outbox.claim(2), [])
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=1)
+    def test_broken_email_does_not_block_batch(self):
+        """Неожиданная ошибка тратит попытку, остальные письма уходят."""
+
+        mail.send_mail("Битое", "Текст", None, ["a@example.com"])
+        mail.send_mail("Целое", "Текст", None, ["b@example.com"])
+        OutboxEmail.objects.filter(subject="Битое").update(payload="{")
+        with self.assertLogs("core.mail.outbox", "ERROR"):
+            self.send_outbox()
+        broken = OutboxEmail.objects.get(subject="Битое")
+        self.assertEqual(broken.status, OutboxEmail.FAILED)
+        self.assertEqual(broken.attempts, 1)
+        self.assertIn("JSONDecodeError", broken.last_error)
+        self.assertEqual(
+            OutboxEmail.objects.get(subject="Целое").status,
+            OutboxEmail.SENT,
+        )
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.tests.commit import run_commit_hooks
+from posts.models import Post, User
+
+
+class AnonymousPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="auth")
+        Post.objects.create(author=self.user, text="Первый")
+        self.client = Client()
+        self.url = reverse("posts:index")
+
+    def test_anonymous_page_cached(self):
+        """Повторная страница гостя отдается без базы и с заголовками CDN."""
+
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"utm_source": "feed"})
+        self.assertEqual(response.content, first.content)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("s-maxage=", response["Cache-Control"])
+        self.assertIn("Cookie", response["Vary"])
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_key_includes_page(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {"page": 2})
+        self.assertIsNotNone(response.context)
+
+    def test_authenticated_bypass(self):
+        """С cookie сессии страница строится заново и не кэшируется."""
+
+        self.client.get(self.url)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIsNotNone(response.context)
+
+    def test_invalidated_by_new_post(self):
+        self.client.get(self.url)
+        with run_commit_hooks():
+            Post.objects.create(author=self.user, text="Второй пост")
+        self.assertContains(self.client.get(self.url), "Второй пост")
@@ -0,0 +1,117 @@
+import threading
+import time
+
+from django.conf import settings
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.db import commit, routing
+from core.db.middleware import STICKY_COOKIE
+from posts.models import Post, User
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = routing.ReplicaRouter()
+        self.addCleanup(routing.reset)
+
+    def read_in_view(self):
+        return routing.replica_reads(lambda: self.router.db_for_read(Post))()
+
+    def test_reads_and_writes(self):
+        """Реплика - только в помеченном представлении и не после записи."""
+
+        routing.reset()
+        self.assertEqual(self.router.db_for_read(Post), "default")
+        self.assertEqual(self.read_in_view(), "replica")
+        self.assertEqual(self.router.db_for_write(Post), "default")
+        self.assertTrue(routing.wrote())
+
+        routing.reset(sticky=True)
+        self.assertEqual(self.read_in_view(), "default")
+
+    @override_settings(DATABASE_REPLICAS=["replica", "replica2"])
+    def test_one_replica_per_request(self):
+        """Все чтения запроса идут в одну реплику."""
+
+        aliases = set()
+        for _ in range(10):
+            routing.reset()
+            chosen = {self.read_in_view() for _ in range(20)}
+            self.assertEqual(len(chosen), 1)
+            aliases |= chosen
+        self.assertLessEqual(aliases, {"replica", "replica2"})
+
+
+class RepeatedInvalidationTest(SimpleTestCase):
+    @override_settings(
+        DATABASE_REPLICAS=["replica"], REPLICA_STICKY_SECONDS=0.01
+    )
+    def test_repeated_after_replica_lag(self):
+        """С репликами инвалидация повторяется; дубли склеиваются."""
+
+        calls = []
+        repeated = threading.Event()
+
+        def bump(key):
+            calls.append(key)
+            if len(calls) == 3:
+                repeated.set()
+
+        commit.invalidate(bump, "feed")
+        commit.invalidate(bump, "feed")
+        self.assertTrue(repeated.wait(5))
+        time.sleep(0.05)
+        self.assertEqual(calls, ["feed"] * 3)
+
+
+class StickyWindowTest(TestCase):
+    databases = set(settings.DATABASES)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auth")
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_cookie_set_after_write(self):
+        """После записи клиент получает окно чтения из основной базы."""
+
+        response = self.client.get(reverse("posts:index"))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        response = self.client.post(
+            reverse("posts:post_create"), {"text": "Текст"}
+        )
+        until = float(response.cookies[STICKY_COOKIE].value)
+        self.assertGreater(until, time.time())
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class TwoDatabasesTest(TestCase):
+    databases = {"default", "replica"}
+
+    def test_author_reads_own_post(self):
+        """Лента читается с реплики, но автор сразу видит свой пост."""
+
+        user = User.objects.create_user(username="auth")
+        client = Client()
+        client.force_login(user)
+        Post.objects.create(author=user, text="Только в основной базе")
+        User.objects.using("replica").create(pk=user.pk, username="auth")
+        anonymous = Client()
+        response = anonymous.get(reverse("posts:index"))
+        self.assertNotContains(response, "Только в основной базе")
+
+        client.post(reverse("posts:post_create"), {"text": "Свежий пост"})
+        response = client.get(reverse("posts:index"))
+        self.assertContains(response, "Свежий пост")
+
+    def test_missing_stats_recounted_on_primary(self):
+        """Строки счетчиков нет на реплике: профиль не перечитывает её."""
+
+        user = User.objects.create_user(username="auth")
+        Post.objects.create(author=user, text="Пост")
+        User.objects.using("replica").create(pk=user.pk, username="auth")
+        response = Client().get(reverse("posts:profile", args=["auth"]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["author_stats"].posts_count, 1)
@@ -0,0 +1,211 @@
+"""JSON API для чтения лент и страницы поста.
+
+Представления берут те же выборки, что и HTML-страницы: ``for_feed``,
+ленту подписок и кэш первой страницы комментариев. Сериализатор - это
+таблица функций по имени поля, без обхода полей модели на каждом
+объекте. ``?fields=id,text`` сокращает ответ, ``?cursor=`` листает
+ленту, адреса миниатюр берутся из ``Post.thumbnails``.
+"""
+from functools import wraps
+
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from core.db.routing import replica_reads
+from . import groups, profiles
+from .comments import comments_page
+from .counters import user_stats
+from .models import Post
+from .paginators import CursorPaginator
+from .thumbnails import thumbnail_urls
+from .timeline import TimelinePaginator, celebrity_ids
+
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+
+
+def author_data(user):
+    return {"username": user.username, "name": user.get_full_name()}
+
+
+def group_data(post):
+    if not post.group_id:
+        return None
+    return {"slug": post.group.slug, "title": post.group.title}
+
+
+def image_data(post):
+    if not post.image:
+        return None
+    return {
+        "url": post.image.url,
+        "width": post.image_width,
+        "height": post.image_height,
+        "thumbnails": thumbnail_urls(post),
+    }
+
+
+POST_FIELDS = {
+    "id": lambda post: post.pk,
+    "text": lambda post: post.text,
+    "pub_date": lambda post: post.pub_date.isoformat(),
+    "author": lambda post: author_data(post.author),
+    "group": group_data,
+    "image": image_data,
+    "comments_count": lambda post: post.comments_count,
+}
+
+
+def comment_data(comment):
+    return {
+        "id": comment.pk,
+        "author": comment.author.username,
+        "text": comment.text,
+        "created": comment.created.isoformat(),
+    }
+
+
+def selected_fields(request):
+    """Пары (имя, функция) для ``?fields=``; ValueError для чужих имен."""
+    names = [name for name in request.GET.get("fields", "").split(",") if name]
+    unknown = sorted(set(names) - set(POST_FIELDS))
+    if unknown:
+        raise ValueError("Неизвестные поля: " + ", ".join(unknown))
+    return [(name, POST_FIELDS[name]) for name in names or POST_FIELDS]
+
+
+def serialize(post, fields):
+    return {name: getter(post) for name, getter in fields}
+
+
+def api_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        json_dumps_params={"ensure_ascii": False, "separators": (",", ":")},
+    )
+
+
+def error_response(detail, status):
+    return api_response({"detail": detail}, status=status)
+
+
+def api_view(view):
+    """Чтение с реплик и ошибка 404 в виде JSON, а не HTML-страницы."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return error_response("Не найдено", 404)
+
+    return replica_reads(wrapper)
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get("limit", PAGE_SIZE))
+    except ValueError:
+        size = PAGE_SIZE
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+def page_link(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.dict()
+    params["cursor"] = cursor
+    return f"{request.path}?{urlencode(params)}"
+
+
+def feed_response(request, posts, **extra):
+    paginator = CursorPaginator(posts, page_size(request))
+    return paginated_response(request, paginator, **extra)
+
+
+def paginated_response(request, paginator, **extra):
+    try:
+        fields = selected_fields(request)
+    except ValueError as error:
+        return error_response(str(error), 400)
+    page = paginator.get_page(cursor=request.GET.get("cursor"))
+    return api_response(
+        {
+            **extra,
+            "results": [serialize(post, fields) for post in page],
+            "next": page_link(request, paginator.next_cursor),
+            "previous": page_link(request, paginator.previous_cursor),
+        }
+    )
+
+
+@api_view
+def index(request):
+    return feed_response(request, Post.objects.for_feed())
+
+
+@api_view
+def group_posts(request, slug):
+    group = groups.get_or_404(slug)
+    return feed_response(
+        request,
+        group.posts.for_feed(),
+        group={
+            "slug": group.slug,
+            "title": group.title,
+            "description": group.description,
+        },
+    )
+
+
+@api_view
+def profile(request, username):
+    author = profiles.get_or_404(username)
+    stats = user_stats(author)
+    return feed_response(
+        request,
+        author.posts.for_author_feed(),
+        author={
+            **author_data(author),
+            "posts_count": stats.posts_count,
+            "followers_count": stats.followers_count,
+            "following_count": stats.following_count,
+        },
+    )
+
+
+@api_view
+def post_detail(request, post_id):
+    try:
+        fields = selected_fields(request)
+    except ValueError as error:
+        return error_response(str(error), 400)
+    post = get_object_or_404(Post.objects.for_feed(), pk=post_id)
+    comments, next_cursor = comments_page(post.pk)
+    comments_next = None
+    if next_cursor:
+        comments_next = "{}?{}".format(
+            reverse("posts:post_comments", args=[post.pk]),
+            urlencode({"format": "json", "cursor": next_cursor}),
+        )
+    return api_response(
+        {
+            "post": serialize(post, fields),
+            "comments": [comment_data(comment) for comment in comments],
+            "comments_next": comments_next,
+        }
+    )
+
+
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return error_response("Нужна авторизация", 401)
+    user = request.user
+    paginator = TimelinePaginator(
+        Post.objects.for_feed(), page_size(request), user, celebrity_ids(user)
+    )
+    return paginated_response(request, paginator)
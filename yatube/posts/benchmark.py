@@ -0,0 +1,307 @@
+"""Замер маршрутов ``posts.urls`` через WSGI-приложение.
+
+Каждый маршрут вызывается как настоящим сервером: окружение WSGI,
+cookie сессии и CSRF, полный стек middleware. Результат - словарь,
+который сохраняется в JSON и сравнивается с прошлыми запусками.
+"""
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from io import BytesIO
+from urllib.parse import urlencode, urlsplit
+from wsgiref.util import setup_testing_defaults
+
+import django
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import get_resolver, reverse
+from django.utils.module_loading import import_string
+
+from .models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class Route:
+    def __init__(self, name, method="GET", auth=False):
+        self.name = name
+        self.method = method
+        self.auth = auth
+
+
+# Сценарий для каждого имени из posts.urls; args подставляет Fixture.
+ROUTES = (
+    Route("posts:index"),
+    Route("posts:group_list"),
+    Route("posts:profile"),
+    Route("posts:profile_followers"),
+    Route("posts:profile_following"),
+    Route("posts:post_detail"),
+    Route("posts:post_comments"),
+    Route("posts:search"),
+    Route("posts:post_create", auth=True),
+    Route("posts:post_edit", auth=True),
+    Route("posts:comment_added", method="POST", auth=True),
+    Route("posts:follow_index", auth=True),
+    Route("posts:profile_follow", auth=True),
+    Route("posts:profile_unfollow", auth=True),
+    Route("posts:events", auth=True),
+    Route("posts:group_events", auth=True),
+    Route("posts:follow_events", auth=True),
+    Route("posts:api_index"),
+    Route("posts:api_group_list"),
+    Route("posts:api_profile"),
+    Route("posts:api_post_detail"),
+    Route("posts:api_follow_index", auth=True),
+)
+
+STREAMS = {"posts:events", "posts:group_events", "posts:follow_events"}
+
+
+def posts_url_names():
+    resolver = get_resolver()
+    _, posts_resolver = resolver.namespace_dict["posts"]
+    return {
+        f"posts:{name}"
+        for name in posts_resolver.reverse_dict
+        if isinstance(name, str)
+    }
+
+
+class Fixture:
+    """Аргументы маршрутов из уже засеянной базы."""
+
+    def __init__(self):
+        post = Post.objects.order_by("-comments_count", "pk").first()
+        self.post = post
+        self.group = Group.objects.order_by("pk").first()
+        # Самый популярный автор и читатель с самыми большими подписками.
+        self.author = post.author
+        self.reader = (
+            User.objects.filter(follower__isnull=False)
+            .exclude(pk=post.author_id)
+            .order_by("-stats__following_count", "pk")
+            .first()
+        )
+
+    def url(self, route):
+        args = {
+            "posts:group_list": [self.group.slug],
+            "posts:profile": [self.author.username],
+            "posts:profile_followers": [self.author.username],
+            "posts:profile_following": [self.reader.username],
+            "posts:post_detail": [self.post.pk],
+            "posts:post_comments": [self.post.pk],
+            "posts:post_edit": [self.post.pk],
+            "posts:comment_added": [self.post.pk],
+            "posts:profile_follow": [self.author.username],
+            "posts:profile_unfollow": [self.author.username],
+            "posts:group_events": [self.group.slug],
+            "posts:api_group_list": [self.group.slug],
+            "posts:api_profile": [self.author.username],
+            "posts:api_post_detail": [self.post.pk],
+        }.get(route.name, [])
+        url = reverse(route.name, args=args)
+        if route.name == "posts:search":
+            url += "?" + urlencode({"q": self.post.text.split()[0]})
+        if route.name in STREAMS:
+            # Поток без ожидания: меряем подключение, а не простой.
+            url += "?timeout=0"
+        return url
+
+    def user_for(self, route):
+        return self.author if route.name == "posts:post_edit" else self.reader
+
+
+class WSGIClient:
+    """Минимальный клиент, который вызывает WSGI-приложение напрямую."""
+
+    def __init__(self, application):
+        self.application = application
+        self.cookies = SimpleCookie()
+
+    def login(self, user):
+        engine = import_string(settings.SESSION_ENGINE)
+        session = engine.SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        self.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        # Получаем CSRF-cookie обычной страницей с формой.
+        self.request("GET", reverse("posts:post_create"))
+
+    def request(self, method, url, data=None):
+        parts = urlsplit(url)
+        body = urlencode(data or {}).encode()
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": parts.path,
+            "QUERY_STRING": parts.query,
+            "REMOTE_ADDR": "127.0.0.1",
+            "CONTENT_TYPE": "application/x-www-form-urlencoded",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": BytesIO(body),
+        }
+        if self.cookies:
+            environ["HTTP_COOKIE"] = self.cookies.output(
+                header="", sep=";"
+            ).strip()
+        csrf = self.cookies.get(settings.CSRF_COOKIE_NAME)
+        if csrf is not None:
+            environ["HTTP_X_CSRFTOKEN"] = csrf.value
+        setup_testing_defaults(environ)
+        status = {}
+
+        def start_response(status_line, headers, exc_info=None):
+            status["code"] = int(status_line.split()[0])
+            for name, value in headers:
+                if name.lower() == "set-cookie":
+                    self.cookies.load(value)
+
+        response = self.application(environ, start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+        return status["code"]
+
+
+def summarize(latencies, statuses, elapsed):
+    ordered = sorted(latencies)
+
+    def percentile(share):
+        index = min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / elapsed, 2),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": percentile(0.5),
+        "p90_ms": percentile(0.9),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "statuses": {
+            str(code): statuses.count(code) for code in sorted(set(statuses))
+        },
+    }
+
+
+class Benchmark:
+    def __init__(
+        self,
+        iterations=50,
+        warmup=5,
+        concurrency=1,
+        cold_cache=False,
+        routes=ROUTES,
+    ):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.concurrency = concurrency
+        self.cold_cache = cold_cache
+        self.routes = routes
+        self.application = WSGIHandler()
+        self.fixture = Fixture()
+        self.local = threading.local()
+
+    def client(self, route):
+        """Клиент потока; для маршрутов с входом - с сессией."""
+        clients = getattr(self.local, "clients", None)
+        if clients is None:
+            clients = self.local.clients = {}
+        user = self.fixture.user_for(route) if route.auth else None
+        key = user.pk if user else None
+        if key not in clients:
+            clients[key] = WSGIClient(self.application)
+            if user:
+                clients[key].login(user)
+        return clients[key]
+
+    def call(self, route, url):
+        if self.cold_cache:
+            cache.clear()
+        data = {"text": "Комментарий из бенчмарка"}
+        started = time.perf_counter()
+        status = self.client(route).request(
+            route.method, url, data if route.method == "POST" else None
+        )
+        return time.perf_counter() - started, status
+
+    def run_route(self, route):
+        url = self.fixture.url(route)
+        for _ in range(self.warmup):
+            self.call(route, url)
+        started = time.perf_counter()
+        if self.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                results = list(
+                    pool.map(
+                        lambda _: self.call(route, url),
+                        range(self.iterations),
+                    )
+                )
+        else:
+            results = [self.call(route, url) for _ in range(self.iterations)]
+        elapsed = time.perf_counter() - started
+        latencies, statuses = zip(*results)
+        return dict(
+            summarize(latencies, list(statuses), elapsed), url=url
+        )
+
+    def run(self):
+        # Подписка и отписка каждый раз начинают с одного состояния.
+        Follow.objects.filter(
+            user=self.fixture.reader, author=self.fixture.author
+        ).delete()
+        return {route.name: self.run_route(route) for route in self.routes}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": settings.DATABASES["default"]["ENGINE"],
+        "cache": settings.CACHES["default"]["BACKEND"],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def compare(current, baseline, metric="p50_ms"):
+    """Изменение метрики по маршрутам в процентах относительно baseline."""
+    changes = {}
+    for name, result in current["routes"].items():
+        before = baseline.get("routes", {}).get(name)
+        if before and before.get(metric):
+            changes[name] = round(
+                (result[metric] - before[metric]) / before[metric] * 100, 1
+            )
+    return changes
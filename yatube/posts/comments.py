@@ -0,0 +1,45 @@
+"""Комментарии поста страницами по курсору на (created, id).
+
+Первая страница - самая частая: её строки вместе с курсором следующей
+страницы кэшируются по версии комментариев поста, которую сигналы
+меняют при добавлении и удалении комментария.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache.stampede import get_or_compute
+from . import feed_cache
+from .models import Comment
+from .paginators import CursorPaginator
+
+FIRST_PAGE_TIMEOUT = 86400
+
+
+def _load(post_id, cursor=None):
+    comments = (
+        Comment.objects.filter(post_id=post_id)
+        .select_related("author")
+        .only("text", "created", "post", "author__username")
+    )
+    paginator = CursorPaginator(
+        comments,
+        settings.COMMENTS_ON_PAGE,
+        field="created",
+        descending=False,
+    )
+    page = paginator.get_page(cursor=cursor)
+    return list(page), paginator.next_cursor
+
+
+def comments_page(post_id, cursor=None):
+    """Комментарии страницы и курсор следующей (или None)."""
+    if cursor:
+        return _load(post_id, cursor)
+    scope = feed_cache.version_key(feed_cache.COMMENTS, post_id)
+    version = feed_cache.get_versions([scope])[scope]
+    return get_or_compute(
+        cache,
+        f"comments-first:{post_id}:{version}",
+        lambda: _load(post_id),
+        FIRST_PAGE_TIMEOUT,
+    )
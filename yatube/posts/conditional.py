@@ -0,0 +1,50 @@
+"""Условные GET для лент и страницы поста.
+
+Представление сначала собирает данные, а ETag считает из версий
+``feed_cache`` и того, что зависит от посетителя. Если клиент прислал
+тот же ETag, ответ - 304 без рендера шаблона. Ответы помечены
+``no-cache``: клиенты и CDN хранят страницу, но каждый раз
+переспрашивают сервер.
+
+Last-Modified не отдается: дата новейшего поста не меняется при правке,
+комментарии, смене имени автора или счетчиков, и ``If-Modified-Since``
+вернул бы 304 на устаревшую страницу.
+"""
+import hashlib
+
+from django.conf import settings
+from django.shortcuts import render
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    quote_etag,
+)
+
+
+def make_etag(request, *parts):
+    """ETag из частей контента, адреса страницы и посетителя."""
+    user = request.user
+    visitor = (
+        user.pk if user.is_authenticated else "",
+        # Токен в форме построен от CSRF-cookie: без нее страница другая.
+        request.META.get("CSRF_COOKIE", ""),
+    )
+    payload = (settings.PAGE_ETAG_SALT, request.get_full_path(), *visitor)
+    digest = hashlib.md5(
+        ":".join(str(part) for part in payload + parts).encode()
+    )
+    return quote_etag(digest.hexdigest())
+
+
+def render_conditional(request, template, context, etag_parts):
+    """render с ETag и ответом 304 без рендера."""
+    etag = make_etag(request, *etag_parts)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = render(request, template, context)
+    response["ETag"] = etag
+    if request.user.is_authenticated:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
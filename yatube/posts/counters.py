@@ -0,0 +1,91 @@
+"""Денормализованные счетчики постов, комментариев и подписок.
+
+Счетчики меняются атомарным ``UPDATE ... SET n = n + 1`` в той же
+транзакции, что и сама запись. Если строки ``UserStats`` еще нет, она
+создается пересчетом при первом чтении, поэтому счетчик не может начать
+с неверного значения. Разошедшиеся счетчики чинит команда
+``reconcile_counters``.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from core.db.commit import after_commit
+from core.db.routing import PRIMARY
+from . import profiles
+from .models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+def _count(queryset, field):
+    """Подзапрос с числом строк queryset на каждую строку внешней модели."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def user_counts(users):
+    """users с аннотациями фактических значений всех счетчиков."""
+    return users.annotate(
+        actual_posts=_count(Post.objects.all(), "author"),
+        actual_followers=_count(Follow.objects.all(), "author"),
+        actual_following=_count(Follow.objects.all(), "user"),
+    )
+
+
+def post_counts(posts):
+    return posts.annotate(
+        actual_comments=_count(Comment.objects.all(), "post"),
+    )
+
+
+def recount_user(user_id):
+    """Пересчитывает счетчики по основной базе; возвращает строку."""
+    user = user_counts(User.objects.using(PRIMARY).filter(pk=user_id)).get()
+    stats, _ = UserStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            "posts_count": user.actual_posts,
+            "followers_count": user.actual_followers,
+            "following_count": user.actual_following,
+        },
+    )
+    after_commit(profiles.invalidate, user_id)
+    return stats
+
+
+def bump_user(user_id, **deltas):
+    """Сдвигает счетчики пользователя, например bump_user(1, posts_count=1).
+
+    Отсутствующую строку не создаем: её пересчитает ``user_stats``.
+    """
+    UserStats.objects.filter(user_id=user_id).update(
+        **{
+            field: Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()
+        }
+    )
+    after_commit(profiles.invalidate, user_id)
+
+
+def bump_post(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=Greatest(F("comments_count") + delta, 0)
+    )
+
+
+def user_stats(user):
+    """Счетчики пользователя; отсутствующая строка создается пересчетом."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        # Перечитывать нельзя: под @replica_reads строки на реплике нет.
+        return recount_user(user.pk)
@@ -0,0 +1,169 @@
+"""Шина событий о новых постах для потоков Server-Sent Events.
+
+После коммита нового поста в шину уходит одно событие с его каналами:
+общая лента, автор и группа. Поток ленты подписок слушает каналы
+авторов, на которых подписан пользователь, поэтому рассылка по
+подписчикам при публикации не нужна. Клиент получает только id новых
+постов и догружает сами посты через API.
+
+``CacheBus`` ведет журнал событий в общем кэше и подходит для
+нескольких процессов с Redis. ``MemoryBus`` - запасной вариант внутри
+одного процесса: без опроса кэша, но и без событий из других воркеров.
+"""
+import json
+import threading
+import time
+from collections import deque, namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+GLOBAL = "global"
+AUTHOR = "author"
+GROUP = "group"
+
+# Сколько последних событий доступно для переподключения.
+BACKLOG = 1000
+POLL_SECONDS = 1.0
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 3000
+
+Event = namedtuple("Event", "id channels data")
+
+
+def channel(scope, ident=""):
+    return f"{scope}:{ident}"
+
+
+def post_channels(post):
+    channels = [channel(GLOBAL), channel(AUTHOR, post.author_id)]
+    if post.group_id:
+        channels.append(channel(GROUP, post.group_id))
+    return channels
+
+
+class EventBus:
+    """Интерфейс шины."""
+
+    def publish(self, channels, data):
+        raise NotImplementedError
+
+    def last_id(self):
+        raise NotImplementedError
+
+    def listen(self, channels, after):
+        """Бесконечно отдает пары (события каналов, id курсора).
+
+        Первая пара - сразу, следующие - не реже раза в ``POLL_SECONDS``,
+        даже если событий нет.
+        """
+        raise NotImplementedError
+
+
+class MemoryBus(EventBus):
+    def __init__(self):
+        self.events = deque(maxlen=BACKLOG)
+        self.sequence = 0
+        self.condition = threading.Condition()
+
+    def publish(self, channels, data):
+        with self.condition:
+            self.sequence += 1
+            self.events.append(Event(self.sequence, frozenset(channels), data))
+            self.condition.notify_all()
+
+    def last_id(self):
+        return self.sequence
+
+    def listen(self, channels, after):
+        while True:
+            with self.condition:
+                events = [
+                    event
+                    for event in self.events
+                    if event.id > after and event.channels & channels
+                ]
+                after = self.sequence
+            yield events, after
+            with self.condition:
+                if self.sequence == after:
+                    self.condition.wait(POLL_SECONDS)
+
+
+class CacheBus(EventBus):
+    """Журнал в кэше: счетчик событий и по ключу на событие."""
+
+    sequence_key = "post-events:sequence"
+    # Событие с выданным id, но еще не записанное, ждем не дольше.
+    gap_seconds = 2
+
+    @staticmethod
+    def event_key(event_id):
+        return f"post-events:{event_id}"
+
+    def publish(self, channels, data):
+        cache.add(self.sequence_key, 0, None)
+        event_id = cache.incr(self.sequence_key)
+        cache.set(self.event_key(event_id), (list(channels), data), 3600)
+
+    def last_id(self):
+        return cache.get(self.sequence_key, 0)
+
+    def listen(self, channels, after):
+        gap_since = None
+        while True:
+            last = self.last_id()
+            # Курсор из будущего значит, что кэш очищен: начинаем заново.
+            after = min(after, last)
+            ids = range(max(after, last - BACKLOG) + 1, last + 1)
+            found = cache.get_many([self.event_key(i) for i in ids])
+            events, held = [], False
+            now = time.monotonic()
+            for event_id in ids:
+                item = found.get(self.event_key(event_id))
+                if item is None:
+                    gap_since = gap_since or now
+                    if now - gap_since < self.gap_seconds:
+                        held = True
+                        break
+                elif channels.intersection(item[0]):
+                    events.append(Event(event_id, frozenset(item[0]), item[1]))
+                after = event_id
+            if not held:
+                gap_since = None
+            yield events, after
+            if not events:
+                time.sleep(POLL_SECONDS)
+
+
+@lru_cache(maxsize=None)
+def get_bus():
+    return import_string(settings.POSTS_EVENT_BUS)()
+
+
+def publish_post(post):
+    get_bus().publish(
+        post_channels(post),
+        {"id": post.pk, "author": post.author_id, "group": post.group_id},
+    )
+
+
+def stream(channels, after, duration):
+    """Строки потока text/event-stream в течение duration секунд."""
+    yield f"retry: {RETRY_MS}\n\n"
+    deadline = time.monotonic() + duration
+    quiet_since = time.monotonic()
+    for events, cursor in get_bus().listen(frozenset(channels), after):
+        now = time.monotonic()
+        for event in events:
+            data = json.dumps(event.data)
+            yield f"id: {event.id}\nevent: post\ndata: {data}\n\n"
+            quiet_since = now
+        if now - quiet_since >= HEARTBEAT_SECONDS:
+            # Пустое событие с id только сдвигает Last-Event-ID клиента.
+            yield f"id: {cursor}\n\n"
+            quiet_since = now
+        if now >= deadline:
+            return
@@ -0,0 +1,102 @@
+"""Версии лент для кэша фрагментов шаблонов.
+
+У каждой области (вся лента, группа, автор, лента подписок пользователя,
+карточка поста, комментарии поста) есть версия в кэше. Версия входит в
+ключ фрагмента, поэтому инвалидация - это запись одной новой версии, а
+старые фрагменты просто перестают читаться и вытесняются по TTL.
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache
+
+from . import timeline
+
+GLOBAL = "global"
+GROUP = "group"
+AUTHOR = "author"
+TIMELINE = "timeline"
+POST = "post"
+COMMENTS = "comments"
+# Имя автора и название группы, которые выводит карточка поста.
+AUTHOR_CARD = "author-card"
+GROUP_CARD = "group-card"
+
+
+def version_key(scope, ident=""):
+    return f"feed-version:{scope}:{ident}"
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+def get_versions(keys):
+    """Текущие версии ключей за одно обращение к кэшу."""
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        for key, version in missing.items():
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return versions
+
+
+def bump(*keys):
+    """Инвалидирует области, записывая им новые версии."""
+    if keys:
+        cache.set_many({key: _new_version() for key in keys}, None)
+
+
+def post_feed_keys(post, timeline_ids=None):
+    """Ключи лент, в которых виден пост.
+
+    ``timeline_ids`` - уже известные подписчики, в ленты которых пост
+    раздан; без них список читается из базы.
+    """
+    keys = [version_key(GLOBAL), version_key(AUTHOR, post.author_id)]
+    if post.group_id:
+        keys.append(version_key(GROUP, post.group_id))
+    if timeline_ids is None:
+        timeline_ids = []
+        if not timeline.is_celebrity(post.author_id):
+            timeline_ids = timeline.follower_ids(post.author_id)
+    keys.extend(version_key(TIMELINE, user_id) for user_id in timeline_ids)
+    return keys
+
+
+def follow_feed_keys(user, celebrities=None):
+    """Ключи ленты подписок: своя лента и авторы, читаемые на лету."""
+    if celebrities is None:
+        celebrities = timeline.celebrity_ids(user)
+    return [version_key(TIMELINE, user.pk)] + [
+        version_key(AUTHOR, author_id) for author_id in celebrities
+    ]
+
+
+def card_keys(post):
+    """Ключи, от которых зависит карточка: пост, его автор и группа."""
+    keys = [
+        version_key(POST, post.pk),
+        version_key(AUTHOR_CARD, post.author_id),
+    ]
+    if post.group_id:
+        keys.append(version_key(GROUP_CARD, post.group_id))
+    return keys
+
+
+def page_version(page, *scope_keys):
+    """Версия страницы ленты с учетом версий карточек её постов.
+
+    Каждому посту страницы проставляется ``card_version`` для ключа
+    фрагмента карточки.
+    """
+    cards = {post.pk: card_keys(post) for post in page}
+    versions = get_versions(list(set(scope_keys).union(*cards.values())))
+    for post in page:
+        post.card_version = ".".join(versions[key] for key in cards[post.pk])
+    digest = hashlib.md5(
+        ":".join(versions[key] for key in sorted(versions)).encode()
+    )
+    return digest.hexdigest()
@@ -0,0 +1,75 @@
+"""Подписки пользователя для проверки «подписан ли» пачкой авторов.
+
+Множество авторов, на которых подписан пользователь, хранится в кэше
+отсортированным массивом 32-битных pk (``array("I")``): 4 байта на
+подписку, проверка - двоичный поиск. Ключ удаляется при подписке и
+отписке. Если подписок больше ``FOLLOW_GRAPH_CACHE_LIMIT``, массив не
+строится, а авторы пачки проверяются одним запросом ``author_id IN``.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+TIMEOUT = 60 * 60
+# Пометка в кэше: подписок слишком много, массив не храним.
+LARGE = "large"
+
+
+def following_key(user_id):
+    return f"following:{user_id}"
+
+
+def following_ids(user_id):
+    """Отсортированный массив pk авторов или None для больших списков."""
+    key = following_key(user_id)
+    cached = cache.get(key)
+    if cached == LARGE:
+        return None
+    if cached is not None:
+        ids = array("I")
+        ids.frombytes(cached)
+        return ids
+    limit = settings.FOLLOW_GRAPH_CACHE_LIMIT
+    rows = list(
+        Follow.objects.filter(user_id=user_id)
+        .order_by("author_id")
+        .values_list("author_id", flat=True)[: limit + 1]
+    )
+    if len(rows) > limit:
+        cache.set(key, LARGE, TIMEOUT)
+        return None
+    ids = array("I", rows)
+    cache.set(key, ids.tobytes(), TIMEOUT)
+    return ids
+
+
+def contains(ids, author_id):
+    index = bisect_left(ids, author_id)
+    return index < len(ids) and ids[index] == author_id
+
+
+def following_among(user_id, author_ids):
+    """Те из ``author_ids``, на кого подписан пользователь."""
+    author_ids = set(author_ids)
+    if not author_ids:
+        return set()
+    ids = following_ids(user_id)
+    if ids is None:
+        return set(
+            Follow.objects.filter(
+                user_id=user_id, author_id__in=author_ids
+            ).values_list("author_id", flat=True)
+        )
+    return {pk for pk in author_ids if contains(ids, pk)}
+
+
+def is_following(user_id, author_id):
+    return author_id in following_among(user_id, [author_id])
+
+
+def invalidate(user_id):
+    cache.delete(following_key(user_id))
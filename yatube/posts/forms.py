@@ -1,4 +1,7 @@
-from django.forms import ModelForm, Textarea, Select
+from django.conf import settings
+from django.forms import ModelForm, Textarea, Select, ValidationError
+
+from . import groups, images
 from .models import Post, Comment
 
 
@@ -35,6 +38,30 @@ class PostForm(ModelForm):
             ),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Список групп берется из справочника; выбранное значение
+        # по-прежнему проверяется запросом к базе.
+        groups.use_for_field(self.fields["group"])
+
+    def clean_image(self):
+        image = self.cleaned_data.get("image")
+        meta = getattr(image, "image", None)
+        if meta is not None:
+            width, height = meta.size
+            if width * height > settings.POST_IMAGE_MAX_PIXELS:
+                raise ValidationError("Картинка слишком большая")
+        return image
+
+    def save(self, commit=True):
+        post = super().save(commit=False)
+        if "image" in self.changed_data:
+            images.attach(post, self.cleaned_data.get("image"))
+        if commit:
+            post.save()
+            self._save_m2m()
+        return post
+
 
 class CommentForm(ModelForm):
     class Meta:
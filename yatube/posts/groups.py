@@ -0,0 +1,92 @@
+"""Справочник групп: копия в памяти процесса поверх общего кэша.
+
+Групп немного, а нужны они почти каждой странице: лента группы ищет
+группу по slug, форма поста показывает список всех групп. Справочник
+целиком лежит в кэше под ключом с версией; процесс держит уже
+собранные объекты ``Group`` и на каждом обращении сверяет только
+версию - одно чтение короткого ключа. Сохранение или удаление группы
+пишет новую версию, и все процессы пересобирают копию при следующем
+обращении. ``cache.clear()`` (импорт, засев) сбрасывает версию так же.
+"""
+from django.core.cache import cache
+from django.forms.models import ModelChoiceIterator
+from django.http import Http404
+
+from . import feed_cache
+from .models import Group
+
+FIELDS = ("id", "title", "slug", "description")
+VERSION_KEY = feed_cache.version_key("groups")
+ROWS_TIMEOUT = 60 * 60
+
+# (версия, справочник); кортеж заменяется целиком, без блокировок.
+_local = (None, None)
+
+
+class Directory:
+    def __init__(self, rows):
+        self.groups = [Group.from_db("default", FIELDS, row) for row in rows]
+        self.by_slug = {group.slug: group for group in self.groups}
+        self.by_id = {group.pk: group for group in self.groups}
+
+
+def rows_key(version):
+    return f"groups:{version}"
+
+
+def directory():
+    global _local
+    version = feed_cache.get_versions([VERSION_KEY])[VERSION_KEY]
+    local_version, local = _local
+    if local_version == version:
+        return local
+    rows = cache.get(rows_key(version))
+    if rows is None:
+        rows = list(Group.objects.order_by("pk").values_list(*FIELDS))
+        cache.set(rows_key(version), rows, ROWS_TIMEOUT)
+    built = Directory(rows)
+    _local = (version, built)
+    return built
+
+
+def invalidate():
+    global _local
+    feed_cache.bump(VERSION_KEY)
+    _local = (None, None)
+
+
+def get(pk):
+    return directory().by_id.get(pk)
+
+
+def get_by_slug(slug):
+    return directory().by_slug.get(slug)
+
+
+def get_or_404(slug):
+    group = get_by_slug(slug)
+    if group is None:
+        raise Http404("Группа не найдена")
+    return group
+
+
+class GroupChoiceIterator(ModelChoiceIterator):
+    """Варианты поля группы из справочника, без запроса к базе."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for group in directory().groups:
+            yield self.choice(group)
+
+    def __len__(self):
+        return len(directory().groups) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(directory().groups)
+
+
+def use_for_field(field):
+    """Подключает справочник к ``ModelChoiceField`` формы."""
+    field.iterator = GroupChoiceIterator
+    field.widget.choices = field.choices
@@ -0,0 +1,103 @@
+"""Нормализация загруженных картинок постов.
+
+Загрузка читается чанками: по ходу считается хэш содержимого, а Pillow
+декодирует JPEG сразу в уменьшенном масштабе (``draft``), так что в
+память не попадает полноразмерный кадр с камеры. Результат без
+метаданных, не больше ``POST_IMAGE_MAX_SIZE`` по каждой стороне,
+перекодирован в ``POST_IMAGE_FORMAT``. Имя файла - хэш исходника,
+поэтому одинаковые загрузки хранятся один раз.
+"""
+import hashlib
+import io
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .models import Post
+
+UPLOAD_TO = "posts/"
+
+StoredImage = namedtuple("StoredImage", "name width height digest")
+
+
+def upload_digest(upload):
+    """sha256 содержимого загрузки, прочитанной чанками."""
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+def stored_name(digest):
+    extension = settings.POST_IMAGE_FORMAT.lower()
+    return f"{UPLOAD_TO}{digest[:2]}/{digest}.{extension}"
+
+
+def normalize(upload):
+    """Перекодированная картинка: (байты, ширина, высота)."""
+    max_size = settings.POST_IMAGE_MAX_SIZE
+    with Image.open(upload) as source:
+        source.draft("RGB", max_size)
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail(max_size, Image.LANCZOS)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        if settings.POST_IMAGE_FORMAT.upper() == "JPEG" or not has_alpha:
+            image = image.convert("RGB")
+        else:
+            image = image.convert("RGBA")
+    # Новый буфер без exif/icc: метаданные исходника не копируются.
+    output = io.BytesIO()
+    image.save(
+        output,
+        settings.POST_IMAGE_FORMAT,
+        quality=settings.POST_IMAGE_QUALITY,
+        optimize=True,
+    )
+    return output.getvalue(), image.width, image.height
+
+
+def known_size(name, digest):
+    """Размеры уже сохраненного файла: из базы, иначе из самого файла."""
+    size = (
+        Post.objects.filter(image_hash=digest)
+        .exclude(image_width=None)
+        .values_list("image_width", "image_height")
+        .first()
+    )
+    if size:
+        return size
+    with default_storage.open(name) as existing:
+        with Image.open(existing) as image:
+            return image.size
+
+
+def store(upload):
+    """Сохраняет нормализованную картинку, переиспользуя дубликаты."""
+    digest = upload_digest(upload)
+    name = stored_name(digest)
+    if default_storage.exists(name):
+        return StoredImage(name, *known_size(name, digest), digest)
+    content, width, height = normalize(upload)
+    name = default_storage.save(name, ContentFile(content))
+    return StoredImage(name, width, height, digest)
+
+
+def attach(post, upload):
+    """Проставляет посту нормализованную картинку и её размеры."""
+    if not upload:
+        post.image = ""
+        post.image_width = post.image_height = None
+        post.image_hash = ""
+        post.thumbnails = ""
+        return
+    stored = store(upload)
+    post.image = stored.name
+    post.image_width = stored.width
+    post.image_height = stored.height
+    post.image_hash = stored.digest
+    # Миниатюры прежней картинки не подходят: их построит schedule().
+    post.thumbnails = ""
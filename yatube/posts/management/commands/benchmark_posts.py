@@ -0,0 +1,92 @@
+import json
+import shutil
+import tempfile
+from dataclasses import asdict, fields
+
+from django.core.management.base import BaseCommand
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    teardown_databases,
+)
+
+from posts import benchmark
+from posts.seeding import Dataset, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Засевает временную базу и замеряет маршруты posts.urls через "
+        "WSGI-приложение; результат - JSON для сравнения между коммитами."
+    )
+
+    def add_arguments(self, parser):
+        for field in fields(Dataset):
+            parser.add_argument(
+                "--" + field.name.replace("_", "-"),
+                type=type(field.default),
+                default=field.default,
+            )
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument(
+            "--cold-cache",
+            action="store_true",
+            help="Очищать кэш перед каждым запросом.",
+        )
+        parser.add_argument("--output", help="Файл для JSON-результата.")
+        parser.add_argument(
+            "--compare", help="JSON прошлого запуска для сравнения p50."
+        )
+
+    def measure(self, dataset, options):
+        Seeder(dataset).run()
+        runner = benchmark.Benchmark(
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            concurrency=options["concurrency"],
+            cold_cache=options["cold_cache"],
+        )
+        return runner.run()
+
+    def handle(self, *args, **options):
+        dataset = Dataset(
+            **{field.name: options[field.name] for field in fields(Dataset)}
+        )
+        missing = benchmark.posts_url_names() - {
+            route.name for route in benchmark.ROUTES
+        }
+        if missing:
+            names = ", ".join(sorted(missing))
+            self.stderr.write(f"Нет сценария для: {names}")
+        media_root = tempfile.mkdtemp()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(DEBUG=False, MEDIA_ROOT=media_root):
+                routes = self.measure(dataset, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            shutil.rmtree(media_root, ignore_errors=True)
+        result = {
+            "environment": benchmark.environment(),
+            "dataset": asdict(dataset),
+            "run": {
+                name: options[name]
+                for name in (
+                    "iterations", "warmup", "concurrency", "cold_cache"
+                )
+            },
+            "routes": routes,
+        }
+        output = json.dumps(result, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                changes = benchmark.compare(result, json.load(file))
+            for name, change in sorted(changes.items()):
+                self.stderr.write(f"{name}: p50 {change:+.1f}%")
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Follow, Group, Post
+from posts.paginators import CursorPaginator
+from posts.timeline import TimelinePaginator, celebrity_ids
+from posts.views import POSTS_ON_PAGE
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Печатает планы запросов для всех лент (EXPLAIN)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Автор и подписчик.")
+        parser.add_argument("--group", help="Slug группы.")
+
+    def feed_queries(self, user, group):
+        """Запросы первой и «глубокой» (по курсору) страницы лент."""
+        feeds = {
+            "index": Post.objects.all(),
+            "group_posts": Post.objects.filter(group=group),
+            "profile": Post.objects.filter(author=user),
+        }
+        for name, queryset in feeds.items():
+            paginator = CursorPaginator(queryset, POSTS_ON_PAGE)
+            first_page = paginator.object_list[:POSTS_ON_PAGE + 1]
+            yield name, first_page
+            anchor = first_page.first()
+            if anchor is not None:
+                value, pk = anchor.pub_date, anchor.pk
+                yield f"{name} (cursor)", paginator.object_list.filter(
+                    paginator._after(value, pk, forward=True)
+                )[:POSTS_ON_PAGE + 1]
+        yield from self.timeline_queries(user)
+        post = Post.objects.filter(author=user).first()
+        yield "post_detail comments", Comment.objects.filter(
+            post=post
+        ).order_by("created", "id")
+        yield "profile following", Follow.objects.filter(
+            user=user, author=user
+        )
+
+    def timeline_queries(self, user):
+        """Выборки ленты подписок: записи ленты и посты знаменитостей."""
+        paginator = TimelinePaginator(
+            Post.objects.all(), POSTS_ON_PAGE, user, celebrity_ids(user)
+        )
+        names = ("follow_index entries", "follow_index celebrities")
+        limit = POSTS_ON_PAGE + 1
+        first_page = list(zip(names, paginator.keys(limit=limit)))
+        yield from first_page
+        anchor = first_page[0][1].first()
+        if anchor is not None:
+            for name, keys in zip(names, paginator.keys(anchor, limit=limit)):
+                yield f"{name} (cursor)", keys
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["username"]:
+            users = users.filter(username=options["username"])
+        groups = Group.objects.all()
+        if options["group"]:
+            groups = groups.filter(slug=options["group"])
+        user, group = users.first(), groups.first()
+        for name, queryset in self.feed_queries(user, group):
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(queryset.explain())
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает группы, посты, комментарии и подписки в NDJSON "
+        "потоком, без загрузки таблиц в память."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output", nargs="?", help="Файл дампа; без него - stdout."
+        )
+        parser.add_argument(
+            "--gzip", action="store_true", help="Сжать файл дампа."
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["output"]:
+            with transfer.open_dump(
+                options["output"], "w", compress=options["gzip"]
+            ) as stream:
+                exported = transfer.export(
+                    stream, chunk_size=options["chunk_size"]
+                )
+        else:
+            exported = transfer.export(
+                self.stdout, chunk_size=options["chunk_size"]
+            )
+        summary = ", ".join(f"{name} {n}" for name, n in exported.items())
+        self.stderr.write(f"Выгружено: {summary}")
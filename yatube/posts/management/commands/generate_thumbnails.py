@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Строит миниатюры всех пресетов для уже загруженных картинок."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=settings.POST_THUMBNAIL_WORKERS
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def batches(self, batch_size):
+        """Пары (pk, имя файла) постов с картинкой, пачками по pk."""
+        posts = Post.objects.exclude(image="").order_by("pk")
+        last_pk = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk).values_list("pk", "image")[
+                    :batch_size
+                ]
+            )
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1][0]
+
+    def handle(self, *args, **options):
+        done = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for batch in self.batches(options["batch_size"]):
+                list(
+                    pool.map(
+                        lambda item: thumbnails.generate_in_worker(*item),
+                        batch,
+                    )
+                )
+                done += len(batch)
+        self.stdout.write(f"Миниатюры построены для постов: {done}")
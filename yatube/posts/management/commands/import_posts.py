@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает дамп export_posts пачками; уже загруженные записи "
+        "пропускаются, поэтому прерванный импорт можно повторить."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Файл дампа, можно .gz.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--skip-derived",
+            action="store_true",
+            help="Не пересобирать счетчики, ленты и поисковый индекс.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transfer.open_dump(options["input"], "r") as stream:
+                loaded = transfer.load(
+                    stream, batch_size=options["batch_size"]
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        summary = ", ".join(f"{name} {n}" for name, n in loaded.items())
+        self.stdout.write(f"Загружено: {summary}")
+        if not options["skip_derived"]:
+            for command in (
+                "reconcile_counters",
+                "rebuild_timelines",
+                "rebuild_search_index",
+            ):
+                call_command(command, stdout=self.stdout)
+        cache.clear()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import search
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Пересобирает поисковый индекс постов."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        with transaction.atomic():
+            backend.clear()
+            indexed = search.reindex(
+                Post.objects.all(), batch_size=options["batch_size"]
+            )
+        backend.optimize()
+        self.stdout.write(f"Проиндексировано постов: {indexed}")
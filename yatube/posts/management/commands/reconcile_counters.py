@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters, profiles
+from posts.models import Post, UserStats
+
+User = get_user_model()
+
+USER_FIELDS = {
+    "posts_count": "actual_posts",
+    "followers_count": "actual_followers",
+    "following_count": "actual_following",
+}
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает разошедшиеся счетчики пачками по первичному ключу."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def batches(self, queryset, batch_size):
+        """Пачки queryset по возрастанию pk без OFFSET."""
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk).order_by("pk")[:batch_size]
+            )
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1].pk
+
+    def reconcile_users(self, batch_size):
+        fixed = 0
+        users = counters.user_counts(User.objects.select_related("stats"))
+        for batch in self.batches(users, batch_size):
+            missing, drifted = [], []
+            for user in batch:
+                actual = {
+                    field: getattr(user, name)
+                    for field, name in USER_FIELDS.items()
+                }
+                stats = getattr(user, "stats", None)
+                if stats is None:
+                    missing.append(UserStats(user=user, **actual))
+                elif any(
+                    getattr(stats, field) != value
+                    for field, value in actual.items()
+                ):
+                    for field, value in actual.items():
+                        setattr(stats, field, value)
+                    drifted.append(stats)
+            with transaction.atomic():
+                UserStats.objects.bulk_create(missing, ignore_conflicts=True)
+                UserStats.objects.bulk_update(drifted, list(USER_FIELDS))
+            profiles.invalidate(
+                *(stats.user_id for stats in missing + drifted)
+            )
+            fixed += len(missing) + len(drifted)
+        return fixed
+
+    def reconcile_posts(self, batch_size):
+        fixed = 0
+        posts = counters.post_counts(Post.objects.only("comments_count"))
+        for batch in self.batches(posts, batch_size):
+            drifted = []
+            for post in batch:
+                if post.comments_count != post.actual_comments:
+                    post.comments_count = post.actual_comments
+                    drifted.append(post)
+            Post.objects.bulk_update(drifted, ["comments_count"])
+            fixed += len(drifted)
+        return fixed
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        users = self.reconcile_users(batch_size)
+        posts = self.reconcile_posts(batch_size)
+        self.stdout.write(
+            f"Исправлено счетчиков: пользователей {users}, постов {posts}"
+        )
@@ -0,0 +1,50 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.seeding import Dataset, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу пользователями, группами, постами, комментариями "
+        "и подписками; один seed - один и тот же набор данных."
+    )
+
+    def add_arguments(self, parser):
+        for field in fields(Dataset):
+            parser.add_argument(
+                "--" + field.name.replace("_", "-"),
+                type=type(field.default),
+                default=field.default,
+            )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Строк в одной транзакции.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Процессов для вставки; в SQLite писатель всегда один.",
+        )
+        parser.add_argument(
+            "--skip-derived",
+            action="store_true",
+            help="Не пересобирать счетчики, ленты и поисковый индекс.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["processes"] < 1:
+            raise CommandError("--batch-size и --processes должны быть > 0")
+        dataset = Dataset(
+            **{field.name: options[field.name] for field in fields(Dataset)}
+        )
+        Seeder(
+            dataset,
+            batch_size=options["batch_size"],
+            processes=options["processes"],
+            stdout=self.stdout,
+        ).run(derived=not options["skip_derived"])
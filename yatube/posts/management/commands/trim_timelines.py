@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = (
+        "Обрезает ленты подписок, переросшие TIMELINE_DEPTH "
+        "на TIMELINE_TRIM_SLACK записей."
+    )
+
+    def handle(self, *args, **options):
+        trimmed = 0
+        for user_id in list(timeline.overflowing_ids()):
+            with transaction.atomic():
+                timeline.trim(user_id)
+            trimmed += 1
+        self.stdout.write(f"Обрезано лент: {trimmed}")
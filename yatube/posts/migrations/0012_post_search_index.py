@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts "
+        "USING fts5(text, author, grp, tokenize = 'unicode61')"
+    )
+    schema_editor.execute(
+        "INSERT INTO posts_post_fts (rowid, text, author, grp) "
+        "SELECT p.id, p.text, "
+        "TRIM(u.username || ' ' || u.first_name || ' ' || u.last_name), "
+        "COALESCE(g.title, '') "
+        f"FROM {Post._meta.db_table} p "
+        f"JOIN {User._meta.db_table} u ON u.id = p.author_id "
+        f"LEFT JOIN {Group._meta.db_table} g ON g.id = p.group_id"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS posts_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_image_meta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -13,6 +13,41 @@ class Group(models.Model):
         return self.title
 
 
+CARD_FIELDS = (
+    "text",
+    "pub_date",
+    "image",
+    "image_width",
+    "image_height",
+    "comments_count",
+    "thumbnails",
+    "group__title",
+    "group__slug",
+)
+
+
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для карточек ленты: автор и группа одним запросом.
+
+        Загружаются только поля, которые выводит карточка, без хэша
+        картинки, описания группы и служебных полей пользователя.
+        """
+        return self.select_related("author", "group").only(
+            *CARD_FIELDS,
+            "author__username",
+            "author__first_name",
+            "author__last_name",
+        )
+
+    def for_author_feed(self):
+        """Карточки для ``author.posts`` без соединения с ``auth_user``.
+
+        Менеджер связи сам проставляет постам уже загруженного автора.
+        """
+        return self.select_related("group").only(*CARD_FIELDS, "author")
+
+
 class Post(models.Model):
     text = models.TextField(
         "Текст поста",
@@ -42,11 +77,55 @@ class Post(models.Model):
         upload_to="posts/",
         blank=True,
     )
+    image_width = models.PositiveIntegerField(
+        "Ширина картинки",
+        null=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        "Высота картинки",
+        null=True,
+        editable=False,
+    )
+    image_hash = models.CharField(
+        "Хэш картинки",
+        max_length=64,
+        blank=True,
+        db_index=True,
+        editable=False,
+    )
+    comments_count = models.PositiveIntegerField(
+        "Комментариев",
+        default=0,
+        editable=False,
+    )
+    # JSON {пресет: имя файла}; заполняется, когда миниатюры построены.
+    thumbnails = models.TextField(
+        "Миниатюры",
+        blank=True,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ["-pub_date"]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"],
+                name="posts_post_date",
+            ),
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="posts_post_author_date",
+            ),
+            models.Index(
+                fields=["group", "-pub_date", "-id"],
+                name="posts_post_group_date",
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -75,6 +154,12 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=["post", "created", "id"],
+                name="posts_comment_post_created",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.text
@@ -91,3 +176,61 @@ class Follow(models.Model):
         related_name="following",
         on_delete=models.CASCADE,
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "author"],
+                name="posts_follow_unique",
+            ),
+        ]
+        # Списки подписчиков и подписок листаются курсором по pk.
+        indexes = [
+            models.Index(fields=["author", "id"], name="posts_follow_author"),
+            models.Index(fields=["user", "id"], name="posts_follow_user"),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """Материализованная лента подписок: пост автора у подписчика."""
+
+    user = models.ForeignKey(
+        User,
+        related_name="timeline_entries",
+        on_delete=models.CASCADE,
+    )
+    post = models.ForeignKey(
+        Post,
+        related_name="timeline_entries",
+        on_delete=models.CASCADE,
+    )
+    pub_date = models.DateTimeField("Дата Публикации")
+
+    class Meta:
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи ленты"
+        unique_together = ("user", "post")
+        indexes = [
+            models.Index(
+                fields=["user", "-pub_date", "-post"],
+                name="posts_timeline_user_date",
+            ),
+        ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счетчики пользователя."""
+
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name="stats",
+        on_delete=models.CASCADE,
+    )
+    posts_count = models.PositiveIntegerField("Постов", default=0)
+    followers_count = models.PositiveIntegerField("Подписчиков", default=0)
+    following_count = models.PositiveIntegerField("Подписок", default=0)
+
+    class Meta:
+        verbose_name = "Счетчики пользователя"
+        verbose_name_plural = "Счетчики пользователей"
@@ -0,0 +1,139 @@
+import base64
+import json
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинатор по паре (field, pk) без COUNT и OFFSET.
+
+    Позиция в ленте передается непрозрачным токеном ``?cursor=``, поэтому
+    глубина страницы не влияет на стоимость запроса. Страница остается
+    обычным ``Page``, а ссылки на соседние страницы хранятся в
+    ``next_cursor`` и ``previous_cursor`` пагинатора.
+
+    Старые ссылки ``?page=N`` идут через OFFSET, поэтому номер урезается
+    до ``max_page``: дальше страница ведет по курсорам. Общего числа
+    объектов пагинатор не считает - числа постов лент берутся из
+    денормализованных счетчиков ``UserStats``.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        field="pub_date",
+        descending=True,
+        max_page=None,
+    ):
+        self.field = field
+        self.descending = descending
+        self.max_page = max_page
+        self.cursor = None
+        self.next_cursor = None
+        self.previous_cursor = None
+        sign = "-" if descending else ""
+        ordering = [f"{sign}pk"]
+        if field != "pk":
+            ordering.insert(0, f"{sign}{field}")
+        super().__init__(object_list.order_by(*ordering), per_page)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def encode_cursor(self, direction, obj):
+        value = getattr(obj, self.field)
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        payload = json.dumps([direction, value, obj.pk]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """Возвращает (direction, value, pk) или None для битого токена."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, value, pk = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            meta = self.object_list.model._meta
+            # "pk" - псевдоним, get_field его не знает.
+            if self.field == "pk":
+                field = meta.pk
+            else:
+                field = meta.get_field(self.field)
+            value = field.to_python(value)
+            pk = meta.pk.to_python(pk)
+        except Exception:
+            return None
+        if direction not in (NEXT, PREVIOUS) or value is None:
+            return None
+        return direction, value, pk
+
+    def _after(self, value, pk, forward, pk_field="pk"):
+        """Условие «строго после (value, pk)» в порядке обхода."""
+        older = forward == self.descending
+        lookup = "lt" if older else "gt"
+        if self.field == "pk":
+            return Q(**{f"{pk_field}__{lookup}": pk})
+        # Избыточная граница {field}__lte/gte позволяет СУБД начать
+        # просмотр индекса с позиции курсора, а не с начала.
+        return Q(**{f"{self.field}__{lookup}e": value}) & (
+            Q(**{f"{self.field}__{lookup}": value})
+            | Q(**{self.field: value, f"{pk_field}__{lookup}": pk})
+        )
+
+    def get_page(self, number=None, cursor=None):
+        """Страница по курсору; ``number`` поддержан для старых ссылок."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is not None:
+            self.cursor = cursor
+            return self._cursor_page(*decoded)
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            number = 1
+        if self.max_page is not None:
+            number = min(number, self.max_page)
+        return self._offset_page(number)
+
+    def fetch(self, after=None, forward=True, offset=0, limit=None):
+        """Строки в порядке обхода, строго после ``after`` = (value, pk)."""
+        queryset = self.object_list
+        if after is not None:
+            queryset = queryset.filter(self._after(*after, forward))
+        if not forward:
+            queryset = queryset.reverse()
+        return list(queryset[offset:offset + limit])
+
+    def _offset_page(self, number):
+        offset = (number - 1) * self.per_page
+        rows = self.fetch(offset=offset, limit=self.per_page + 1)
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        return self._build_page(rows, number, has_more, number > 1)
+
+    def _cursor_page(self, direction, value, pk):
+        forward = direction == NEXT
+        rows = self.fetch((value, pk), forward, limit=self.per_page + 1)
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if forward:
+            return self._build_page(rows, 1, has_more, True)
+        rows.reverse()
+        return self._build_page(rows, 1, True, has_more)
+
+    def _build_page(self, rows, number, has_next, has_previous):
+        if rows and has_next:
+            self.next_cursor = self.encode_cursor(NEXT, rows[-1])
+        if rows and has_previous:
+            self.previous_cursor = self.encode_cursor(PREVIOUS, rows[0])
+        return Page(rows, number, self)
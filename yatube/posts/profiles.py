@@ -0,0 +1,74 @@
+"""Сводка пользователя для страниц профиля без запросов к ``auth_user``.
+
+Сводка - это pk, имя и счетчики ``UserStats`` одной строкой в кэше под
+ключом pk; отдельный ключ сопоставляет username с pk. Ключ по pk
+удаляется при сохранении пользователя и при любом сдвиге счетчиков.
+Ключ имени не удаляется: после смены username он ведет к сводке с
+другим именем и считается промахом.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import UserStats
+
+User = get_user_model()
+
+FIELDS = ("id", "username", "first_name", "last_name")
+STATS_FIELDS = ("posts_count", "followers_count", "following_count")
+TIMEOUT = 5 * 60
+
+
+def name_key(username):
+    return f"user-id:{username}"
+
+
+def summary_key(user_id):
+    return f"user-summary:{user_id}"
+
+
+def build(row):
+    """Пользователь с уже загруженными ``stats`` из строки сводки."""
+    user = User.from_db("default", FIELDS, row[:len(FIELDS)])
+    counts = row[len(FIELDS):]
+    if counts[0] is not None:
+        user.stats = UserStats(
+            user_id=user.pk, **dict(zip(STATS_FIELDS, counts))
+        )
+    return user
+
+
+def load(username):
+    return (
+        User.objects.filter(username=username)
+        .values_list(*FIELDS, *(f"stats__{name}" for name in STATS_FIELDS))
+        .first()
+    )
+
+
+def get(username):
+    user_id = cache.get(name_key(username))
+    if user_id is not None:
+        row = cache.get(summary_key(user_id))
+        if row is not None and row[1] == username:
+            return build(row)
+    row = load(username)
+    if row is None:
+        return None
+    keys = {name_key(username): row[0]}
+    # Без строки счетчиков её создаст user_stats; такую сводку не храним.
+    if row[len(FIELDS)] is not None:
+        keys[summary_key(row[0])] = row
+    cache.set_many(keys, TIMEOUT)
+    return build(row)
+
+
+def get_or_404(username):
+    user = get(username)
+    if user is None:
+        raise Http404("Пользователь не найден")
+    return user
+
+
+def invalidate(*user_ids):
+    cache.delete_many([summary_key(user_id) for user_id in user_ids])
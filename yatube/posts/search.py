@@ -0,0 +1,229 @@
+"""Полнотекстовый поиск по постам.
+
+Индекс покрывает текст поста, имя автора и название группы и
+обновляется сигналами при сохранении и удалении. Бэкенд выбирается
+настройкой ``POSTS_SEARCH_BACKEND``: по умолчанию это FTS5 в SQLite,
+для других СУБД есть переносимый ``LikeBackend`` без индекса.
+
+Результаты упорядочены по паре (score, pk): чем меньше score, тем выше
+пост в выдаче. Страницы выдачи - keyset по этой паре.
+"""
+import base64
+import json
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+TERM_RE = re.compile(r"\w+")
+
+
+def terms(query):
+    return TERM_RE.findall(query.lower())[:10]
+
+
+def document(post):
+    """Индексируемые поля поста: (текст, автор, группа)."""
+    author = post.author
+    return (
+        post.text,
+        f"{author.username} {author.get_full_name()}".strip(),
+        post.group.title if post.group_id else "",
+    )
+
+
+class SearchBackend:
+    """Интерфейс поискового индекса."""
+
+    def update(self, posts):
+        raise NotImplementedError
+
+    def remove(self, post_ids):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def optimize(self):
+        pass
+
+    def search(self, query, after=None, limit=10):
+        """Список (score, post_id) строго после пары ``after``."""
+        raise NotImplementedError
+
+
+class SqliteFtsBackend(SearchBackend):
+    """Инвертированный индекс FTS5; таблицу создает миграция."""
+
+    table = "posts_post_fts"
+    # Веса bm25 для колонок text, author, grp.
+    weights = (1.0, 4.0, 2.0)
+
+    def update(self, posts):
+        rows = [(post.pk, *document(post)) for post in posts]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(row[0],) for row in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, text, author, grp) "
+                "VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(pk,) for pk in post_ids],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} ({self.table}) "
+                "VALUES ('optimize')"
+            )
+
+    @staticmethod
+    def match_expression(words):
+        # Каждое слово - префиксный запрос в кавычках, поэтому
+        # спецсимволы синтаксиса FTS5 из строки поиска не проходят.
+        return " ".join(f'"{word}"*' for word in words)
+
+    def search(self, query, after=None, limit=10):
+        words = terms(query)
+        if not words:
+            return []
+        weights = ", ".join(str(weight) for weight in self.weights)
+        sql = (
+            f"SELECT bm25({self.table}, {weights}) AS score, rowid "
+            f"FROM {self.table} WHERE {self.table} MATCH %s"
+        )
+        params = [self.match_expression(words)]
+        if after is not None:
+            sql += " AND (score, rowid) > (%s, %s)"
+            params.extend(after)
+        sql += " ORDER BY score, rowid LIMIT %s"
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+class LikeBackend(SearchBackend):
+    """Поиск без индекса через icontains; новые посты выше."""
+
+    def update(self, posts):
+        pass
+
+    def remove(self, post_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, query, after=None, limit=10):
+        words = terms(query)
+        if not words:
+            return []
+        posts = Post.objects.order_by("-pk")
+        for word in words:
+            posts = posts.filter(
+                Q(text__icontains=word)
+                | Q(author__username__icontains=word)
+                | Q(author__first_name__icontains=word)
+                | Q(author__last_name__icontains=word)
+                | Q(group__title__icontains=word)
+            )
+        if after is not None:
+            posts = posts.filter(pk__lt=after[1])
+        return [(-pk, pk) for pk in posts.values_list("pk", flat=True)[:limit]]
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.POSTS_SEARCH_BACKEND)()
+
+
+def index_posts(posts):
+    get_backend().update(posts)
+
+
+def remove_posts(post_ids):
+    get_backend().remove(post_ids)
+
+
+def reindex(posts, batch_size=500):
+    """Переиндексирует посты выборки пачками по pk; возвращает их число."""
+    posts = posts.select_related("author", "group").order_by("pk")
+    done, last_pk = 0, 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return done
+        index_posts(batch)
+        done += len(batch)
+        last_pk = batch[-1].pk
+
+
+def reindex_ids(post_ids, batch_size=500):
+    """Переиндексирует посты по списку pk; возвращает их число."""
+    done = 0
+    for start in range(0, len(post_ids), batch_size):
+        chunk = post_ids[start:start + batch_size]
+        done += reindex(Post.objects.filter(pk__in=chunk), batch_size)
+    return done
+
+
+class SearchPaginator(Paginator):
+    """Страницы выдачи по курсору (score, pk), только вперед."""
+
+    def __init__(self, query, per_page):
+        super().__init__([], per_page)
+        self.query = query
+        self.cursor = None
+        self.next_cursor = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @staticmethod
+    def encode_cursor(score, pk):
+        payload = json.dumps([score, pk]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            score, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return float(score), int(pk)
+        except Exception:
+            return None
+
+    def get_page(self, cursor=None):
+        after = self.decode_cursor(cursor) if cursor else None
+        if after is not None:
+            self.cursor = cursor
+        hits = get_backend().search(self.query, after, self.per_page + 1)
+        if len(hits) > self.per_page:
+            hits = hits[: self.per_page]
+            self.next_cursor = self.encode_cursor(*hits[-1])
+        posts = Post.objects.for_feed().in_bulk([pk for _, pk in hits])
+        rows = [posts[pk] for _, pk in hits if pk in posts]
+        return Page(rows, 1, self)
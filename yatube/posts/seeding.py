@@ -0,0 +1,300 @@
+"""Детерминированная генерация тестовых данных.
+
+Строки создаются пачками по ``batch_size``; каждая пачка вставляется
+``bulk_create`` в своей транзакции, так что память не растет с размером
+набора. Генератор случайных чисел у пачки свой, из (seed, таблица, номер
+пачки), а pk - из фиксированного диапазона пачки, а не из порядка, в
+котором пачки закончились. Поэтому тот же ``seed`` с теми же размерами и
+``batch_size`` дает тот же набор строк и те же связи при любом числе
+процессов, и замеры на разных коммитах сравнимы.
+
+Подписки распределены по степенному закону: немногие авторы собирают
+большую часть подписчиков, как в живой ленте. Строки вставляются без
+сигналов, а производные данные (счетчики, ленты подписок, поисковый
+индекс) пересобираются командами после вставки.
+"""
+import io
+import multiprocessing
+import random
+from dataclasses import dataclass
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Count, Max, Min
+from PIL import Image
+
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+SEED_PASSWORD = "seed-password"
+WORDS = (
+    "лента пост автор группа подписка новости утро вечер город река "
+    "кофе поезд книга музыка фильм погода проект команда код релиз"
+).split()
+
+
+@dataclass
+class Dataset:
+    users: int = 200
+    groups: int = 10
+    posts: int = 2000
+    comments: int = 5000
+    follows_per_user: int = 20
+    image_ratio: float = 0.2
+    # Показатель степенного закона популярности авторов.
+    follow_alpha: float = 1.2
+    seed: int = 1
+    # Префикс имен пользователей и групп: повторный засев в ту же базу.
+    prefix: str = "user"
+
+
+def chunk_rng(dataset, kind, index):
+    return random.Random(f"{dataset.seed}:{kind}:{index}")
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def power_law_rank(rng, size, alpha):
+    """Ранг от 0 до size - 1 с вероятностью ~ 1 / (ранг + 1) ** alpha.
+
+    Обратная функция непрерывного степенного распределения: выбор не
+    требует массива весов и не дорожает с числом авторов.
+    """
+    u = rng.random()
+    if alpha == 1:
+        rank = (size + 1) ** u
+    else:
+        power = 1 - alpha
+        rank = (((size + 1) ** power - 1) * u + 1) ** (1 / power)
+    return min(int(rank) - 1, size - 1)
+
+
+def follow_pairs(dataset, rng, followers, authors):
+    """Пары (подписчик, автор); в ``authors`` популярные идут первыми."""
+    limit = min(dataset.follows_per_user, len(authors) - 1)
+    for user_id in followers:
+        chosen = set()
+        for _ in range(limit * 3):
+            if len(chosen) >= limit:
+                break
+            author_id = authors[
+                power_law_rank(rng, len(authors), dataset.follow_alpha)
+            ]
+            if author_id != user_id:
+                chosen.add(author_id)
+        for author_id in sorted(chosen):
+            yield user_id, author_id
+
+
+def build_users(dataset, rng, start, count, context):
+    return [
+        User(
+            username=f"{dataset.prefix}{i}",
+            first_name=f"Имя{i}",
+            last_name=f"Фамилия{i}",
+            password=context["password"],
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def build_groups(dataset, rng, start, count, context):
+    return [
+        Group(
+            title=f"Группа {dataset.prefix}{i}",
+            slug=f"{dataset.prefix}-group-{i}",
+            description=words(rng, 12),
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def build_posts(dataset, rng, start, count, context):
+    groups = list(context["groups"]) + [None]
+    images = context["images"]
+    posts = []
+    for _ in range(count):
+        image = ""
+        if images and rng.random() < dataset.image_ratio:
+            image = rng.choice(images)
+        posts.append(
+            Post(
+                author_id=rng.choice(context["users"]),
+                group_id=rng.choice(groups),
+                text=words(rng, rng.randint(5, 60)),
+                image=image,
+            )
+        )
+    return posts
+
+
+def build_comments(dataset, rng, start, count, context):
+    return [
+        Comment(
+            post_id=rng.choice(context["posts"]),
+            author_id=rng.choice(context["users"]),
+            text=words(rng, rng.randint(3, 20)),
+        )
+        for _ in range(count)
+    ]
+
+
+def build_follows(dataset, rng, start, count, context):
+    users = context["users"]
+    pairs = follow_pairs(dataset, rng, users[start:start + count], users)
+    return [Follow(user_id=user, author_id=author) for user, author in pairs]
+
+
+BUILDERS = {
+    "users": build_users,
+    "groups": build_groups,
+    "posts": build_posts,
+    "comments": build_comments,
+    "follows": build_follows,
+}
+
+
+def insert_chunk(dataset, task):
+    """Строит одну пачку и вставляет ее с pk от ``first_pk``."""
+    kind, index, start, count, first_pk, context = task
+    rng = chunk_rng(dataset, kind, index)
+    objs = BUILDERS[kind](dataset, rng, start, count, context)
+    if not objs:
+        return 0
+    for offset, obj in enumerate(objs):
+        obj.pk = first_pk + offset
+    model = type(objs[0])
+    # Django 2.2 не ограничивает batch_size лимитами СУБД (у SQLite -
+    # 500 строк в составном INSERT), поэтому урезаем его сами.
+    batch_size = connection.ops.bulk_batch_size(
+        model._meta.concrete_fields, objs
+    )
+    with transaction.atomic():
+        model.objects.bulk_create(objs, batch_size=batch_size)
+    return len(objs)
+
+
+def last_pk(model):
+    return model.objects.aggregate(last=Max("pk"))["last"] or 0
+
+
+def reset_sequence(model):
+    """Сдвигает автоинкремент за pk, вставленные явно (нужно PostgreSQL)."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def inserted_ids(model, after):
+    """pk строк после ``after``: range, если они идут без пропусков."""
+    rows = model.objects.filter(pk__gt=after)
+    bounds = rows.aggregate(low=Min("pk"), high=Max("pk"), total=Count("pk"))
+    if not bounds["total"]:
+        return []
+    if bounds["high"] - bounds["low"] + 1 == bounds["total"]:
+        return range(bounds["low"], bounds["high"] + 1)
+    return list(rows.order_by("pk").values_list("pk", flat=True))
+
+
+class Seeder:
+    def __init__(self, dataset, batch_size=1000, processes=1, stdout=None):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.processes = processes
+        self.stdout = stdout or io.StringIO()
+
+    def tasks(self, kind, total, context, first_pk, width):
+        for index, start in enumerate(range(0, total, self.batch_size)):
+            count = min(self.batch_size, total - start)
+            yield kind, index, start, count, first_pk + start * width, context
+
+    def insert(self, model, kind, total, context, width=1):
+        """Вставляет total строк пачками; возвращает pk новых строк.
+
+        Пачке с ``start`` достаются pk от ``after + 1 + start * width``:
+        ``width`` - наибольшее число строк на единицу ``total``.
+        """
+        after = last_pk(model)
+        insert = partial(insert_chunk, self.dataset)
+        tasks = self.tasks(kind, total, context, after + 1, max(width, 1))
+        if self.processes > 1 and total > self.batch_size:
+            # Дочерние процессы не должны делить соединение родителя.
+            connections.close_all()
+            pool = multiprocessing.get_context("fork").Pool(
+                self.processes, initializer=connections.close_all
+            )
+            with pool:
+                inserted = sum(pool.imap_unordered(insert, tasks))
+        else:
+            inserted = sum(map(insert, tasks))
+        reset_sequence(model)
+        self.stdout.write(f"{kind}: {inserted}")
+        return inserted_ids(model, after)
+
+    def seed_images(self, count=5):
+        """Несколько картинок, которые делят посты с картинками."""
+        rng = chunk_rng(self.dataset, "images", 0)
+        names = []
+        for i in range(count):
+            color = tuple(rng.randrange(256) for _ in range(3))
+            name = f"posts/seed/{self.dataset.seed}-{i}.jpg"
+            # Содержимое зависит только от seed: готовый файл тот же.
+            if not default_storage.exists(name):
+                buffer = io.BytesIO()
+                Image.new("RGB", (960, 540), color).save(buffer, "JPEG")
+                name = default_storage.save(
+                    name, ContentFile(buffer.getvalue())
+                )
+            names.append(name)
+        return names
+
+    def rebuild_derived(self):
+        for command in (
+            "reconcile_counters",
+            "rebuild_timelines",
+            "rebuild_search_index",
+        ):
+            call_command(command, stdout=self.stdout)
+        cache.clear()
+
+    def run(self, derived=True):
+        dataset = self.dataset
+        password = make_password(SEED_PASSWORD)
+        users = self.insert(
+            User, "users", dataset.users, {"password": password}
+        )
+        groups = self.insert(Group, "groups", dataset.groups, {})
+        images = self.seed_images() if dataset.image_ratio else []
+        posts = self.insert(
+            Post,
+            "posts",
+            dataset.posts,
+            {"users": users, "groups": groups, "images": images},
+        )
+        self.insert(
+            Comment,
+            "comments",
+            dataset.comments,
+            {"users": users, "posts": posts},
+        )
+        self.insert(
+            Follow,
+            "follows",
+            len(users),
+            {"users": users},
+            width=dataset.follows_per_user,
+        )
+        if derived:
+            self.rebuild_derived()
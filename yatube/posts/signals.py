@@ -0,0 +1,212 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.cache import pages
+from core.db.commit import after_commit, invalidate
+from . import (
+    counters,
+    events,
+    feed_cache,
+    follow_graph,
+    groups,
+    profiles,
+    search,
+    timeline,
+)
+from .models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+NAME_FIELDS = ("username", "first_name", "last_name")
+
+
+@receiver(post_save, sender=User)
+def user_create_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+def names(user):
+    return tuple(getattr(user, field) for field in NAME_FIELDS)
+
+
+@receiver(pre_save, sender=User)
+def user_remember_names(
+    sender, instance, update_fields=None, raw=False, **kwargs
+):
+    instance.previous_names = None
+    # Вход в систему сохраняет только last_login - имена не читаем.
+    if raw or not instance.pk:
+        return
+    if update_fields and not set(NAME_FIELDS) & set(update_fields):
+        return
+    instance.previous_names = (
+        User.objects.filter(pk=instance.pk).values_list(*NAME_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def user_reindex_posts(sender, instance, created, raw=False, **kwargs):
+    """Имена автора в индексе и карточках - только если они изменились.
+
+    Смена пароля или правка в админке сохраняет пользователя целиком,
+    но посты переиндексировать незачем.
+    """
+    previous = getattr(instance, "previous_names", None)
+    if created or raw or previous is None or previous == names(instance):
+        return
+    after_commit(profiles.invalidate, instance.pk)
+    after_commit(
+        feed_cache.bump,
+        feed_cache.version_key(feed_cache.AUTHOR_CARD, instance.pk),
+    )
+    search.reindex(Post.objects.filter(author=instance))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    after_commit(profiles.invalidate, instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def post_remember_group(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance.previous_group_id = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list("group_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_fan_out(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_posts([instance])
+    after_commit(pages.invalidate)
+    if created:
+        counters.bump_user(instance.author_id, posts_count=1)
+        timeline_ids = timeline.fan_out(instance)
+        after_commit(
+            feed_cache.bump,
+            *feed_cache.post_feed_keys(instance, timeline_ids),
+        )
+        # Клиент сразу запросит пост: событие - только после коммита.
+        transaction.on_commit(lambda: events.publish_post(instance))
+        return
+    keys = [feed_cache.version_key(feed_cache.POST, instance.pk)]
+    previous_group_id = getattr(instance, "previous_group_id", None)
+    if previous_group_id != instance.group_id:
+        keys.extend(
+            feed_cache.version_key(feed_cache.GROUP, group_id)
+            for group_id in {previous_group_id, instance.group_id} - {None}
+        )
+    after_commit(feed_cache.bump, *keys)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    after_commit(pages.invalidate)
+    counters.bump_user(instance.author_id, posts_count=-1)
+    search.remove_posts([instance.pk])
+    after_commit(feed_cache.bump, *feed_cache.post_feed_keys(instance))
+
+
+def comment_keys(comment):
+    return [
+        feed_cache.version_key(feed_cache.POST, comment.post_id),
+        feed_cache.version_key(feed_cache.COMMENTS, comment.post_id),
+    ]
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_post(instance.post_id, 1)
+        after_commit(feed_cache.bump, *comment_keys(instance))
+        after_commit(pages.invalidate)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump_post(instance.post_id, -1)
+    after_commit(feed_cache.bump, *comment_keys(instance))
+    after_commit(pages.invalidate)
+
+
+@receiver(post_save, sender=Group)
+def group_changed(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    after_commit(
+        feed_cache.bump,
+        feed_cache.version_key(feed_cache.GROUP, instance.pk),
+        feed_cache.version_key(feed_cache.GROUP_CARD, instance.pk),
+    )
+    after_commit(groups.invalidate)
+    after_commit(pages.invalidate)
+    if not created:
+        search.reindex(instance.posts.all())
+
+
+@receiver(pre_delete, sender=Group)
+def group_remember_posts(sender, instance, **kwargs):
+    # Посты отвязываются UPDATE без сигналов: их pk нужны для индекса.
+    instance.post_ids = list(instance.posts.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    after_commit(groups.invalidate)
+    after_commit(pages.invalidate)
+    post_ids = getattr(instance, "post_ids", None)
+    if post_ids:
+        transaction.on_commit(lambda: search.reindex_ids(post_ids))
+
+
+@receiver(post_save, sender=Follow)
+def follow_fill_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_user(instance.author_id, followers_count=1)
+        counters.bump_user(instance.user_id, following_count=1)
+        after_commit(follow_graph.invalidate, instance.user_id)
+        timeline.add_author(instance.user, instance.author)
+        after_commit(
+            feed_cache.bump,
+            feed_cache.version_key(feed_cache.TIMELINE, instance.user_id),
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def unfollow_clear_timeline(sender, instance, **kwargs):
+    counters.bump_user(instance.author_id, followers_count=-1)
+    counters.bump_user(instance.user_id, following_count=-1)
+    after_commit(follow_graph.invalidate, instance.user_id)
+    timeline.remove_author(instance.user_id, instance.author_id)
+    after_commit(
+        feed_cache.bump,
+        feed_cache.version_key(feed_cache.TIMELINE, instance.user_id),
+    )
+    if timeline.left_celebrities(instance.author_id):
+        author_id = instance.author_id
+        transaction.on_commit(lambda: backfill_timelines(author_id))
+
+
+def backfill_timelines(author_id):
+    """Раздает посты бывшей знаменитости и сбрасывает ленты подписчиков."""
+    user_ids = timeline.backfill_author(author_id)
+    if user_ids:
+        invalidate(
+            feed_cache.bump,
+            *(
+                feed_cache.version_key(feed_cache.TIMELINE, user_id)
+                for user_id in user_ids
+            ),
+        )
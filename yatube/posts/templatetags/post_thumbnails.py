@@ -0,0 +1,11 @@
+from django import template
+
+from posts.thumbnails import card_thumbnail
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(post, preset):
+    """Готовая миниатюра пресета из ``post.thumbnails`` или None."""
+    return card_thumbnail(post, preset)
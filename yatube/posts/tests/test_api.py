@@ -0,0 +1,125 @@
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Comment, Follow, Group, Post, User
+from .test_forms import PICTURE
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAILS_ASYNC=False)
+class ApiTest(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.author = User.objects.create_user(
+            username="auth", first_name="Лев", last_name="Толстой"
+        )
+        self.reader = User.objects.create_user(username="reader")
+        self.group = Group.objects.create(
+            title="Группа", slug="group", description="Описание"
+        )
+        self.posts = [
+            Post.objects.create(
+                author=self.author, group=self.group, text=f"Пост {i}"
+            )
+            for i in range(12)
+        ]
+        self.client = Client()
+
+    def get(self, name, *args, **params):
+        response = self.client.get(reverse(name, args=args), params)
+        return response, json.loads(response.content)
+
+    def test_feed_pages_by_cursor(self):
+        """Лента отдается страницами; ссылка next ведет на продолжение."""
+
+        response, data = self.get("posts:api_index")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertNotIn(b": ", response.content)
+        self.assertEqual(len(data["results"]), 10)
+        first = data["results"][0]
+        self.assertEqual(first["id"], self.posts[-1].pk)
+        self.assertEqual(
+            first["author"], {"username": "auth", "name": "Лев Толстой"}
+        )
+        self.assertEqual(first["group"], {"slug": "group", "title": "Группа"})
+        self.assertIsNone(first["image"])
+        data = json.loads(self.client.get(data["next"]).content)
+        self.assertEqual(
+            [post["id"] for post in data["results"]],
+            [self.posts[1].pk, self.posts[0].pk],
+        )
+        self.assertIsNone(data["next"])
+        self.assertIsNotNone(data["previous"])
+
+    def test_field_selection(self):
+        _, data = self.get("posts:api_index", fields="id,text", limit=2)
+        self.assertEqual(
+            data["results"],
+            [
+                {"id": self.posts[11].pk, "text": "Пост 11"},
+                {"id": self.posts[10].pk, "text": "Пост 10"},
+            ],
+        )
+        self.assertIn("fields=id%2Ctext", data["next"])
+        response, data = self.get("posts:api_index", fields="id,password")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", data["detail"])
+
+    def test_group_profile_and_post(self):
+        """Группа, профиль и пост с комментариями - как на страницах."""
+
+        _, data = self.get("posts:api_group_list", self.group.slug)
+        self.assertEqual(data["group"]["description"], "Описание")
+        _, data = self.get("posts:api_profile", "auth")
+        self.assertEqual(data["author"]["posts_count"], 12)
+        post = self.posts[0]
+        Comment.objects.create(post=post, author=self.reader, text="Ответ")
+        _, data = self.get("posts:api_post_detail", post.pk)
+        self.assertEqual(data["post"]["comments_count"], 1)
+        self.assertEqual(data["comments"][0]["text"], "Ответ")
+        self.assertIsNone(data["comments_next"])
+        response, _ = self.get("posts:api_post_detail", 0)
+        self.assertEqual(response.status_code, 404)
+
+    def test_follow_requires_login(self):
+        response, _ = self.get("posts:api_follow_index")
+        self.assertEqual(response.status_code, 401)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+        _, data = self.get("posts:api_follow_index", fields="id")
+        self.assertEqual(data["results"][0], {"id": self.posts[-1].pk})
+
+    def test_thumbnails_precomputed(self):
+        """Адреса миниатюр сохранены при построении и не ищутся в sorl."""
+
+        post = Post.objects.create(
+            author=self.author,
+            text="С картинкой",
+            image=SimpleUploadedFile(
+                name="small.gif", content=PICTURE, content_type="image/gif"
+            ),
+        )
+        _, data = self.get("posts:api_post_detail", post.pk, fields="image")
+        self.assertEqual(data["post"]["image"]["thumbnails"], {})
+        thumbnails.generate(post.pk, post.image.name)
+        _, data = self.get("posts:api_post_detail", post.pk, fields="image")
+        urls = data["post"]["image"]["thumbnails"]
+        self.assertEqual(set(urls), set(settings.POST_THUMBNAIL_PRESETS))
+        post.refresh_from_db()
+        self.assertEqual(
+            urls["card"], thumbnails.card_thumbnail(post, "card")["url"]
+        )
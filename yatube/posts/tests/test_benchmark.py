@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from .. import benchmark, seeding
+from ..models import Comment, Follow
+from ..seeding import Dataset, Seeder
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+DATASET = Dataset(users=12, groups=2, posts=40, comments=60, seed=7)
+
+
+# Потоки SSE замеряются, только если живая лента включена.
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POSTS_LIVE_FEED=True)
+class BenchmarkTest(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_seeding_is_deterministic(self):
+        """Один seed - одинаковый граф подписок со степенным хвостом."""
+
+        user_ids = range(1, 101)
+        dataset = Dataset(users=100, follows_per_user=10, seed=3)
+
+        def pairs():
+            rng = seeding.chunk_rng(dataset, "follows", 0)
+            return list(
+                seeding.follow_pairs(dataset, rng, user_ids, user_ids)
+            )
+
+        first = pairs()
+        self.assertEqual(first, pairs())
+        followers = [author for _, author in first]
+        self.assertGreater(followers.count(1), followers.count(100) * 5)
+
+    def test_every_route_measured(self):
+        """Все маршруты posts.urls замерены и отвечают без ошибок."""
+
+        Seeder(DATASET).run()
+        comments = Comment.objects.count()
+        runner = benchmark.Benchmark(iterations=3, warmup=0)
+        routes = runner.run()
+        self.assertEqual(set(routes), benchmark.posts_url_names())
+        for name, result in routes.items():
+            with self.subTest(route=name):
+                self.assertEqual(result["requests"], 3)
+                self.assertLessEqual(set(result["statuses"]), {"200", "302"})
+        self.assertEqual(Comment.objects.count(), comments + 3)
+        self.assertFalse(
+            Follow.objects.filter(
+                user=runner.fixture.reader, author=runner.fixture.author
+            ).exists()
+        )
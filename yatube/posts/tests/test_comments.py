@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from core.tests.commit import run_commit_hooks
+from ..models import Comment, Post, User
+
+
+@override_settings(COMMENTS_ON_PAGE=3)
+class CommentsPageTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="auth")
+        self.post = Post.objects.create(author=self.user, text="Текст")
+        self.comments = [
+            Comment.objects.create(
+                post=self.post, author=self.user, text=f"Коммент {i}"
+            )
+            for i in range(5)
+        ]
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_comments_paged_by_cursor(self):
+        """Первая страница на посте, остальное - фрагментом и JSON."""
+
+        response = self.client.get(
+            reverse("posts:post_detail", args=[self.post.pk])
+        )
+        self.assertEqual(response.context["comments"], self.comments[:3])
+        cursor = response.context["next_cursor"]
+        self.assertIsNotNone(cursor)
+
+        url = reverse("posts:post_comments", args=[self.post.pk])
+        response = self.client.get(url, {"cursor": cursor})
+        self.assertEqual(response.context["comments"], self.comments[3:])
+        self.assertNotContains(response, "Показать еще")
+
+        data = self.client.get(url, {"format": "json"}).json()
+        self.assertEqual(
+            [comment["text"] for comment in data["comments"]],
+            ["Коммент 0", "Коммент 1", "Коммент 2"],
+        )
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(len(data["comments"]), 2)
+        self.assertIsNone(data["next"])
+
+    def test_first_page_cached_until_comment_added(self):
+        """Первая страница берется из кэша до нового комментария."""
+
+        url = reverse("posts:post_comments", args=[self.post.pk])
+        self.client.get(url)
+        Comment.objects.filter(pk=self.comments[0].pk).update(text="Старое")
+        self.assertContains(self.client.get(url), "Коммент 0")
+
+        with run_commit_hooks():
+            Comment.objects.filter(post=self.post).delete()
+            self.client.post(
+                reverse("posts:comment_added", args=[self.post.pk]),
+                {"text": "Новый"},
+            )
+        response = self.client.get(url)
+        self.assertContains(response, "Новый")
+        self.assertNotContains(response, "Коммент")
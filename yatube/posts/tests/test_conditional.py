@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from core.tests.commit import run_commit_hooks
+from ..models import Comment, Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="auth")
+        self.group = Group.objects.create(title="Группа", slug="group")
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text="Текст"
+        )
+        self.client = Client()
+        self.urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=[self.group.slug]),
+            reverse("posts:profile", args=[self.user.username]),
+            reverse("posts:post_detail", args=[self.post.pk]),
+        )
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_not_modified_without_render(self):
+        """Повторный запрос с тем же ETag получает 304 без шаблона."""
+
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.has_header("Last-Modified"))
+                # Ленты для гостей кэширует CDN, остальное - только клиент.
+                self.assertIn(
+                    "max-age=0" if url in self.urls[:2] else "no-cache",
+                    response["Cache-Control"],
+                )
+                response = self.revalidate(url, response)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.templates)
+                self.assertEqual(response.content, b"")
+
+    def test_changes_reset_etag(self):
+        """Новый пост, правка и комментарий дают новую версию страниц."""
+
+        changes = (
+            lambda: Post.objects.create(
+                author=self.user, group=self.group, text="Новый"
+            ),
+            lambda: Post.objects.get(pk=self.post.pk).save(),
+            lambda: Comment.objects.create(
+                post=self.post, author=self.user, text="Коммент"
+            ),
+        )
+        for change in changes:
+            responses = {url: self.client.get(url) for url in self.urls}
+            with run_commit_hooks():
+                change()
+            for url, response in responses.items():
+                with self.subTest(url=url):
+                    self.assertEqual(
+                        self.revalidate(url, response).status_code, 200
+                    )
+
+    def test_old_date_does_not_hide_changes(self):
+        """If-Modified-Since без ETag не дает 304 после правки."""
+
+        url = reverse("posts:post_detail", args=[self.post.pk])
+        with run_commit_hooks():
+            Comment.objects.create(
+                post=self.post, author=self.user, text="Коммент"
+            )
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Коммент")
+
+    def test_etag_depends_on_visitor(self):
+        """Страница гостя не подходит вошедшему пользователю."""
+
+        url = reverse("posts:index")
+        response = self.client.get(url)
+        self.client.force_login(self.user)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+        response = self.client.get(url)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
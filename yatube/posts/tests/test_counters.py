@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Comment, Follow, Post, User, UserStats
+
+POST_TEXT = "Тестовый текст"
+
+
+class CountersTest(TestCase):
+    def setUp(self) -> None:
+        self.author = User.objects.create_user(username="auth")
+        self.reader = User.objects.create_user(username="reader")
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_counters_follow_writes(self):
+        """Счетчики меняются вместе с постами, комментариями и подписками."""
+
+        post = Post.objects.create(author=self.author, text=POST_TEXT)
+        Comment.objects.create(post=post, author=self.reader, text="a")
+        Follow.objects.create(user=self.reader, author=self.author)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+
+        Follow.objects.filter(user=self.reader).delete()
+        post.comments.all().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_reconcile_counters(self):
+        """reconcile_counters чинит разошедшиеся и недостающие счетчики."""
+
+        post = Post.objects.create(author=self.author, text=POST_TEXT)
+        Comment.objects.create(post=post, author=self.reader, text="a")
+        UserStats.objects.filter(user=self.author).update(posts_count=7)
+        UserStats.objects.filter(user=self.reader).delete()
+        Post.objects.update(comments_count=5)
+        call_command("reconcile_counters", batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.reader).posts_count, 0)
@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from .. import events, views
+from ..models import Follow, Group, Post, User
+
+
+class EventBusTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def first_batch(self, bus, channels, after):
+        return next(bus.listen(frozenset(channels), after))
+
+    def test_buses_filter_by_channel(self):
+        """Слушатель получает только события своих каналов после курсора."""
+
+        for bus in (events.MemoryBus(), events.CacheBus()):
+            with self.subTest(bus=type(bus).__name__):
+                after = bus.last_id()
+                bus.publish(["global", "group:1"], {"id": 1})
+                bus.publish(["global", "group:2"], {"id": 2})
+                found, cursor = self.first_batch(bus, ["group:2"], after)
+                self.assertEqual([event.data for event in found], [{"id": 2}])
+                self.assertEqual(cursor, bus.last_id())
+                found, _ = self.first_batch(bus, ["global"], after + 1)
+                self.assertEqual([event.data for event in found], [{"id": 2}])
+
+    def test_cache_bus_waits_for_unwritten_event(self):
+        """Выданный, но не записанный id не теряет следующие события."""
+
+        bus = events.CacheBus()
+        bus.publish(["global"], {"id": 1})
+        cache.incr(bus.sequence_key)
+        bus.publish(["global"], {"id": 3})
+        found, cursor = self.first_batch(bus, ["global"], 0)
+        self.assertEqual([event.data for event in found], [{"id": 1}])
+        self.assertEqual(cursor, 1)
+        bus.gap_seconds = 0
+        found, cursor = self.first_batch(bus, ["global"], cursor)
+        self.assertEqual([event.data for event in found], [{"id": 3}])
+        self.assertEqual(cursor, 3)
+
+
+class StreamDurationTest(SimpleTestCase):
+    @override_settings(EVENTS_STREAM_SECONDS=30)
+    def test_timeout_clamped(self):
+        """Нечисловой, бесконечный или отрицательный timeout не ломает срок."""
+
+        factory = RequestFactory()
+        cases = {
+            "nan": 30,
+            "inf": 30,
+            "-inf": 30,
+            "-5": 0,
+            "abc": 30,
+            "2.5": 2.5,
+            "100": 30,
+        }
+        for value, expected in cases.items():
+            with self.subTest(timeout=value):
+                request = factory.get("/events/", {"timeout": value})
+                self.assertEqual(views.stream_duration(request), expected)
+
+
+@override_settings(POSTS_LIVE_FEED=True)
+class EventStreamTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="auth")
+        self.reader = User.objects.create_user(username="reader")
+        self.group = Group.objects.create(title="Группа", slug="group")
+        self.client = Client()
+
+    def read(self, url, after):
+        response = self.client.get(url, {"last_id": after, "timeout": 0})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return b"".join(response.streaming_content).decode()
+
+    def test_new_posts_streamed(self):
+        """После коммита id поста приходит в ленты, где он виден."""
+
+        after = events.get_bus().last_id()
+        post = Post.objects.create(
+            author=self.author, group=self.group, text="Новый"
+        )
+        other = Post.objects.create(author=self.reader, text="Чужой")
+        data = f'data: {{"id": {post.pk}, '
+        self.client.force_login(self.author)
+        body = self.read(reverse("posts:events"), after)
+        self.assertIn("event: post", body)
+        self.assertIn(data, body)
+        self.assertIn(f'data: {{"id": {other.pk}, ', body)
+        body = self.read(
+            reverse("posts:group_events", args=[self.group.slug]), after
+        )
+        self.assertIn(data, body)
+        self.assertNotIn(f'"id": {other.pk}', body)
+
+        follow_url = reverse("posts:follow_events")
+        self.client.logout()
+        self.assertEqual(self.client.get(follow_url).status_code, 302)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+        body = self.read(follow_url, after)
+        self.assertIn(data, body)
+        self.assertNotIn(f'"id": {other.pk}', body)
+
+    def test_stream_opt_in(self):
+        """Поток открывают только вошедшие и только при POSTS_LIVE_FEED."""
+
+        url = reverse("posts:index")
+        self.assertNotContains(self.client.get(url), "EventSource")
+        self.assertEqual(
+            self.client.get(reverse("posts:events")).status_code, 302
+        )
+        self.client.force_login(self.reader)
+        self.assertContains(self.client.get(url), "EventSource")
+        with self.settings(POSTS_LIVE_FEED=False):
+            self.assertNotContains(self.client.get(url), "EventSource")
+            response = self.client.get(reverse("posts:events"))
+            self.assertEqual(response.status_code, 404)
@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.tests.commit import run_commit_hooks
+from .. import follow_graph
+from ..models import Follow, Post, User
+
+
+class FollowGraphTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username="reader")
+        self.authors = [
+            User.objects.create_user(username=f"author{i}") for i in range(3)
+        ]
+        for author in self.authors[:2]:
+            Follow.objects.create(user=self.reader, author=author)
+
+    def test_batch_from_cached_array(self):
+        """Пачка авторов проверяется без запросов при теплом кэше."""
+
+        ids = [author.pk for author in self.authors]
+        expected = set(ids[:2])
+        self.assertEqual(
+            follow_graph.following_among(self.reader.pk, ids), expected
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                follow_graph.following_among(self.reader.pk, ids), expected
+            )
+
+    @override_settings(FOLLOW_GRAPH_CACHE_LIMIT=1)
+    def test_large_following_queries_batch(self):
+        ids = [author.pk for author in self.authors]
+        follow_graph.following_among(self.reader.pk, ids)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                follow_graph.following_among(self.reader.pk, ids),
+                set(ids[:2]),
+            )
+
+    def test_invalidated_on_follow_and_unfollow(self):
+        author = self.authors[2]
+        self.assertFalse(follow_graph.is_following(self.reader.pk, author.pk))
+        with run_commit_hooks():
+            Follow.objects.create(user=self.reader, author=author)
+            # До коммита кэш не сбрасывается: соседний запрос не закэширует
+            # подписки без новой строки.
+            self.assertIsNotNone(
+                cache.get(follow_graph.following_key(self.reader.pk))
+            )
+        self.assertTrue(follow_graph.is_following(self.reader.pk, author.pk))
+        with run_commit_hooks():
+            Follow.objects.filter(user=self.reader, author=author).delete()
+        self.assertFalse(follow_graph.is_following(self.reader.pk, author.pk))
+
+    def test_feed_marks_followed_authors(self):
+        Post.objects.create(author=self.authors[0], text="Подписан")
+        Post.objects.create(author=self.authors[2], text="Не подписан")
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse("posts:index"))
+        marks = {
+            post.text: post.author_followed
+            for post in response.context["page_obj"]
+        }
+        self.assertEqual(marks, {"Подписан": True, "Не подписан": False})
+        self.assertContains(response, "Вы подписаны на автора", count=1)
+        anonymous = Client().get(reverse("posts:index"))
+        self.assertNotContains(anonymous, "Вы подписаны на автора")
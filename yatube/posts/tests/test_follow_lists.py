@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import views
+from ..models import Follow, User
+
+
+class FollowListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="auth")
+        self.followers = [
+            User.objects.create_user(username=f"reader{i}")
+            for i in range(views.USERS_ON_PAGE + 5)
+        ]
+        for user in self.followers:
+            Follow.objects.create(user=user, author=self.author)
+        self.client = Client()
+
+    def walk(self, url):
+        """Имена со всех страниц списка по ссылкам «Следующая»."""
+        names, cursor = [], None
+        for _ in range(10):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    url, {"cursor": cursor} if cursor else {}
+                )
+            self.assertEqual(response.status_code, 200)
+            for query in queries.captured_queries:
+                self.assertNotIn("COUNT(", query["sql"])
+                self.assertNotIn("OFFSET", query["sql"])
+            names += [user.username for user in response.context["users"]]
+            cursor = response.context["page_obj"].paginator.next_cursor
+            if cursor is None:
+                return response, names
+        self.fail("Курсор не продвигается")
+
+    def test_followers_newest_first(self):
+        response, names = self.walk(
+            reverse("posts:profile_followers", args=["auth"])
+        )
+        expected = [user.username for user in reversed(self.followers)]
+        self.assertEqual(names, expected)
+        self.assertEqual(response.context["total"], len(self.followers))
+
+    def test_following(self):
+        reader = self.followers[0]
+        other = User.objects.create_user(username="other")
+        Follow.objects.create(user=reader, author=other)
+        response, names = self.walk(
+            reverse("posts:profile_following", args=[reader.username])
+        )
+        self.assertEqual(names, ["other", "auth"])
+        self.assertEqual(response.context["total"], 2)
+
+    def test_unknown_user(self):
+        response = self.client.get(
+            reverse("posts:profile_followers", args=["missing"])
+        )
+        self.assertEqual(response.status_code, 404)
@@ -1,5 +1,8 @@
 import shutil
 import tempfile
+from io import BytesIO
+
+from PIL import Image
 
 from django.test import TestCase, Client, override_settings
 from django.urls import reverse
@@ -28,7 +31,7 @@ PICTURE = (
 )
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAILS_ASYNC=False)
 class PostCreateFormTest(TestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -81,13 +84,44 @@ class PostCreateFormTest(TestCase):
             reverse("posts:profile", kwargs={"username": AUTHOR}),
         )
         self.assertEqual(Post.objects.count(), post_count + 1)
-        self.assertTrue(
-            Post.objects.filter(
-                author=self.user,
-                text=POST_TEXT,
-                image="posts/small.gif",
-            ).exists()
-        )
+        post = Post.objects.exclude(image="").get(author=self.user)
+        self.assertRegex(post.image.name, r"^posts/\w\w/\w{64}\.webp$")
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+
+    def test_post_image_normalized(self):
+        """Картинка уменьшается, теряет exif, дубликаты хранятся один раз."""
+
+        source = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = "Camera"
+        Image.new("RGB", (4000, 1000), "red").save(
+            source, "JPEG", exif=exif.tobytes()
+        )
+        posts = []
+        for _ in range(2):
+            uploaded = SimpleUploadedFile(
+                name="photo.jpg",
+                content=source.getvalue(),
+                content_type="image/jpeg",
+            )
+            form = PostForm(
+                data={"text": POST_TEXT}, files={"image": uploaded}
+            )
+            self.assertTrue(form.is_valid(), form.errors)
+            post = form.save(commit=False)
+            post.author = self.user
+            post.save()
+            posts.append(post)
+        first, second = posts
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(
+            (first.image_width, first.image_height),
+            settings.POST_IMAGE_MAX_SIZE[:1] + (480,),
+        )
+        with Image.open(first.image.path) as image:
+            self.assertEqual(image.format, "WEBP")
+            self.assertEqual(image.size, (1920, 480))
+            self.assertNotIn("exif", image.info)
 
     def test_post_edit(self):
         new_post = Post.objects.create(
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.tests.commit import run_commit_hooks
+from .. import groups
+from ..forms import PostForm
+from ..models import Group, User
+
+
+class GroupDirectoryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(
+            title="Группа", slug="group", description="Описание"
+        )
+
+    def test_lookup_without_queries(self):
+        """Повторные обращения не ходят в базу."""
+
+        groups.directory()
+        with self.assertNumQueries(0):
+            self.assertEqual(groups.get_by_slug("group").pk, self.group.pk)
+            self.assertEqual(groups.get(self.group.pk).title, "Группа")
+            self.assertIsNone(groups.get_by_slug("missing"))
+
+    def test_shared_cache_without_local_copy(self):
+        """Другой процесс собирает справочник из общего кэша."""
+
+        groups.directory()
+        groups._local = (None, None)
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(groups.get_by_slug("group"))
+
+    def test_invalidated_on_save_and_delete(self):
+        groups.directory()
+        self.group.title = "Новое название"
+        with run_commit_hooks():
+            self.group.save()
+            # До коммита справочник не сбрасывается.
+            self.assertEqual(groups.get_by_slug("group").title, "Группа")
+        self.assertEqual(groups.get_by_slug("group").title, "Новое название")
+        with run_commit_hooks():
+            self.group.delete()
+        self.assertIsNone(groups.get_by_slug("group"))
+        response = Client().get(reverse("posts:group_list", args=["group"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_form_choices_from_directory(self):
+        """Список групп формы рендерится без запросов к базе."""
+
+        Group.objects.create(title="Вторая", slug="second")
+        groups.directory()
+        with self.assertNumQueries(0):
+            html = str(PostForm()["group"])
+        self.assertIn("Группа", html)
+        self.assertIn("Вторая", html)
+
+    def test_form_saves_chosen_group(self):
+        author = User.objects.create_user(username="auth")
+        form = PostForm(data={"text": "Текст", "group": self.group.pk})
+        self.assertTrue(form.is_valid(), form.errors)
+        post = form.save(commit=False)
+        post.author = author
+        post.save()
+        self.assertEqual(post.group_id, self.group.pk)
+        form = PostForm(data={"text": "Текст", "group": 999})
+        self.assertFalse(form.is_valid())
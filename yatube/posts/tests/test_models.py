@@ -1,6 +1,7 @@
+from django.db import IntegrityError
 from django.test import TestCase
 
-from ..models import Post, Group, User
+from ..models import Follow, Post, Group, User
 
 AUTHOR = "auth"
 GROUP_TITLE = "Тестовая Группа"
@@ -63,3 +64,14 @@ class PostModelTest(TestCase):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_value
                 )
+
+
+class FollowModelTest(TestCase):
+    def test_follow_is_unique(self):
+        """Нельзя подписаться на автора дважды."""
+
+        user = User.objects.create_user(username="follower")
+        author = User.objects.create_user(username=AUTHOR)
+        Follow.objects.create(user=user, author=author)
+        with self.assertRaises(IntegrityError):
+            Follow.objects.create(user=user, author=author)
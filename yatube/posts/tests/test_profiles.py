@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.tests.commit import run_commit_hooks
+from .. import profiles
+from ..models import Follow, Post, User
+
+
+class ProfileSummaryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username="auth", first_name="Иван", last_name="Петров"
+        )
+        Post.objects.create(author=self.author, text="Текст")
+        self.client = Client()
+
+    def test_warm_profile_skips_auth_user(self):
+        """На теплом кэше страница профиля не читает auth_user."""
+
+        url = reverse("posts:profile", args=["auth"])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Иван Петров")
+        for query in queries.captured_queries:
+            self.assertNotIn('"auth_user"', query["sql"])
+
+    def test_counts_follow_changes(self):
+        profiles.get("auth")
+        reader = User.objects.create_user(username="reader")
+        with run_commit_hooks():
+            Post.objects.create(author=self.author, text="Еще")
+            Follow.objects.create(user=reader, author=self.author)
+        stats = profiles.get("auth").stats
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.followers_count, 1)
+
+    def test_invalidated_on_user_update(self):
+        profiles.get("auth")
+        self.author.username = "renamed"
+        self.author.first_name = "Петр"
+        with run_commit_hooks():
+            self.author.save()
+        self.assertIsNone(profiles.get("auth"))
+        renamed = profiles.get("renamed")
+        self.assertEqual(renamed.get_full_name(), "Петр Петров")
+        response = self.client.get(reverse("posts:profile", args=["auth"]))
+        self.assertEqual(response.status_code, 404)
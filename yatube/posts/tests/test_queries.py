@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class QueryBudgetMixin:
+    """Проверка, что страница укладывается в бюджет запросов к базе."""
+
+    def assertQueryBudget(self, client, url, budget):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        return len(queries)
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    # Бюджеты с авторизацией: сессия и пользователь - еще два запроса.
+    # Ленты при холодном кэше еще читают подписки читателя. Лента
+    # подписок читает ключи записей по индексу, затем посты по pk.
+    budgets = {
+        "posts:index": 4,
+        "posts:group_list": 5,
+        "posts:profile": 6,
+        "posts:profile_followers": 4,
+        "posts:profile_following": 4,
+        "posts:follow_index": 5,
+        "posts:post_detail": 5,
+        "posts:search": 4,
+        "posts:api_index": 3,
+        "posts:api_group_list": 4,
+        "posts:api_profile": 5,
+        "posts:api_follow_index": 5,
+        "posts:api_post_detail": 4,
+    }
+
+    def setUp(self) -> None:
+        self.author = User.objects.create_user(username="auth")
+        self.reader = User.objects.create_user(username="reader")
+        self.group = Group.objects.create(
+            title="Группа", slug="group", description="Описание"
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def add_posts(self, number):
+        for _ in range(number):
+            post = Post.objects.create(
+                author=self.author, group=self.group, text="Текст поста"
+            )
+            Comment.objects.create(post=post, author=self.reader, text="a")
+        return post
+
+    def urls(self, post):
+        return {
+            "posts:index": reverse("posts:index"),
+            "posts:group_list": reverse(
+                "posts:group_list", args=[self.group.slug]
+            ),
+            "posts:profile": reverse("posts:profile", args=["auth"]),
+            "posts:profile_followers": reverse(
+                "posts:profile_followers", args=["auth"]
+            ),
+            "posts:profile_following": reverse(
+                "posts:profile_following", args=["reader"]
+            ),
+            "posts:follow_index": reverse("posts:follow_index"),
+            "posts:post_detail": reverse("posts:post_detail", args=[post.pk]),
+            "posts:search": reverse("posts:search") + "?q=текст",
+            "posts:api_index": reverse("posts:api_index"),
+            "posts:api_group_list": reverse(
+                "posts:api_group_list", args=[self.group.slug]
+            ),
+            "posts:api_profile": reverse("posts:api_profile", args=["auth"]),
+            "posts:api_follow_index": reverse("posts:api_follow_index"),
+            "posts:api_post_detail": reverse(
+                "posts:api_post_detail", args=[post.pk]
+            ),
+        }
+
+    def test_queries_do_not_grow_with_page(self):
+        """Число запросов не зависит от числа постов и комментариев."""
+
+        post = self.add_posts(1)
+        single = {
+            name: self.assertQueryBudget(self.client, url, self.budgets[name])
+            for name, url in self.urls(post).items()
+        }
+        post = self.add_posts(9)
+        for _ in range(9):
+            Comment.objects.create(post=post, author=self.author, text="b")
+        for name, url in self.urls(post).items():
+            with self.subTest(view=name):
+                self.assertEqual(
+                    self.assertQueryBudget(
+                        self.client, url, self.budgets[name]
+                    ),
+                    single[name],
+                )
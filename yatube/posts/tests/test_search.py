@@ -0,0 +1,104 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from core.tests.commit import run_commit_hooks
+from .. import search
+from ..models import Group, Post, User
+from ..search import SearchPaginator
+
+
+class SearchTest(TestCase):
+    def setUp(self) -> None:
+        self.author = User.objects.create_user(
+            username="auth", first_name="Лев", last_name="Толстой"
+        )
+        self.group = Group.objects.create(
+            title="Рыбалка", slug="fishing", description="Про рыбалку"
+        )
+        self.client = Client()
+
+    def found(self, query):
+        response = self.client.get(reverse("posts:search"), {"q": query})
+        return [post.pk for post in response.context["page_obj"]]
+
+    def test_index_follows_writes(self):
+        """Индекс обновляется при создании, правке и удалении поста."""
+
+        post = Post.objects.create(author=self.author, text="Утренний клев")
+        self.assertEqual(self.found("клев"), [post.pk])
+        self.assertEqual(self.found("Толстой"), [post.pk])
+        self.assertEqual(self.found("утрен"), [post.pk])
+
+        post.text = "Вечерний закат"
+        post.group = self.group
+        post.save()
+        self.assertEqual(self.found("клев"), [])
+        self.assertEqual(self.found("рыбалка закат"), [post.pk])
+
+        self.group.title = "Охота"
+        self.group.save()
+        self.assertEqual(self.found("охота"), [post.pk])
+
+        post.delete()
+        self.assertEqual(self.found("закат"), [])
+
+    def test_ranking_and_cursor(self):
+        """Лучшие совпадения выше, страницы идут по курсору."""
+
+        weak = Post.objects.create(
+            author=self.author, text="закат " + "слово " * 50
+        )
+        strong = Post.objects.create(author=self.author, text="закат закат")
+        self.assertEqual(self.found("закат"), [strong.pk, weak.pk])
+        self.assertEqual(self.found('"закат*('), [strong.pk, weak.pk])
+
+        paginator = SearchPaginator("закат", 1)
+        self.assertEqual(list(paginator.get_page()), [strong])
+        second = SearchPaginator("закат", 1)
+        self.assertEqual(list(second.get_page(paginator.next_cursor)), [weak])
+        self.assertFalse(second.has_next)
+
+    def test_rebuild_search_index(self):
+        """rebuild_search_index восстанавливает потерянный индекс."""
+
+        post = Post.objects.create(author=self.author, text="Утренний клев")
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM posts_post_fts")
+        self.assertEqual(self.found("клев"), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.found("клев"), [post.pk])
+
+    def test_reindex_only_on_name_change(self):
+        """Сохранение без смены имен не переиндексирует посты автора."""
+
+        post = Post.objects.create(author=self.author, text="Утренний клев")
+        with mock.patch.object(
+            search, "reindex", wraps=search.reindex
+        ) as reindex:
+            self.author.set_password("new-password")
+            self.author.save()
+            self.author.email = "auth@example.com"
+            self.author.save(update_fields=["email", "last_name"])
+            reindex.assert_not_called()
+
+            self.author.last_name = "Николаевич"
+            self.author.save()
+            reindex.assert_called_once()
+        self.assertEqual(self.found("Николаевич"), [post.pk])
+
+    def test_group_delete_reindexes_posts(self):
+        """После удаления группы её название не находит посты."""
+
+        post = Post.objects.create(
+            author=self.author, group=self.group, text="Утренний клев"
+        )
+        self.assertEqual(self.found("рыбалка"), [post.pk])
+        with run_commit_hooks():
+            self.group.delete()
+        self.assertEqual(self.found("рыбалка"), [])
+        self.assertEqual(self.found("клев"), [post.pk])
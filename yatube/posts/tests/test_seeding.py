@@ -0,0 +1,115 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+OPTIONS = dict(
+    users=30,
+    groups=3,
+    posts=120,
+    comments=200,
+    follows_per_user=5,
+    seed=11,
+    batch_size=25,
+    skip_derived=True,
+)
+
+
+def snapshot():
+    """Набор данных без pk: имена, тексты и связи."""
+    return (
+        list(
+            Post.objects.order_by("pk").values_list(
+                "author__username", "group__slug", "text", "image"
+            )
+        ),
+        list(
+            Comment.objects.order_by("pk").values_list(
+                "post__text", "author__username", "text"
+            )
+        ),
+        sorted(
+            Follow.objects.values_list("user__username", "author__username")
+        ),
+    )
+
+
+class ReversedPool:
+    """Пул, у которого пачки заканчиваются в обратном порядке."""
+
+    def __init__(self, processes, initializer=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def imap_unordered(self, func, tasks):
+        return [func(task) for task in reversed(list(tasks))]
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SeedYatubeTest(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def seed(self, **options):
+        call_command("seed_yatube", stdout=StringIO(), **options)
+
+    def test_seed_counts(self):
+        """Команда создает заданное число строк пачками."""
+
+        self.seed(**OPTIONS)
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 120)
+        self.assertEqual(Comment.objects.count(), 200)
+        self.assertEqual(Follow.objects.count(), 30 * 5)
+
+    def test_seed_is_deterministic(self):
+        """Один seed дает тот же набор, другой - иной."""
+
+        self.seed(**OPTIONS)
+        first = snapshot()
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.seed(**OPTIONS)
+        self.assertEqual(snapshot(), first)
+        self.seed(**dict(OPTIONS, seed=12, prefix="other"))
+        posts = Post.objects.filter(author__username__startswith="other")
+        self.assertNotEqual(
+            list(posts.order_by("pk").values_list("text", flat=True)),
+            [text for _, _, text, _ in first[0]],
+        )
+
+    def test_seed_ignores_chunk_order(self):
+        """Порядок завершения пачек в процессах не меняет набор."""
+
+        self.seed(**OPTIONS)
+        first = snapshot()
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        context = mock.Mock(Pool=ReversedPool)
+        with mock.patch(
+            "posts.seeding.multiprocessing.get_context", return_value=context
+        ):
+            self.seed(**OPTIONS, processes=3)
+        self.assertEqual(snapshot(), first)
@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Post, User
+from .test_forms import PICTURE
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAILS_ASYNC=False)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.post = Post.objects.create(
+            author=User.objects.create_user(username="auth"),
+            text="Тестовый текст",
+            image=SimpleUploadedFile(
+                name="small.gif", content=PICTURE, content_type="image/gif"
+            ),
+        )
+        self.client = Client()
+
+    def test_original_until_generated(self):
+        """До построения в ленте исходная картинка, после - миниатюра."""
+
+        self.assertIsNone(thumbnails.card_thumbnail(self.post, "card"))
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, f'src="{self.post.image.url}"')
+
+        thumbnails.generate(self.post.pk, self.post.image.name)
+        self.post.refresh_from_db()
+        for preset, (geometry, _) in settings.POST_THUMBNAIL_PRESETS.items():
+            with self.subTest(preset=preset):
+                thumbnail = thumbnails.card_thumbnail(self.post, preset)
+                self.assertEqual(
+                    "x".join((thumbnail["width"], thumbnail["height"])),
+                    geometry,
+                )
+        response = self.client.get(reverse("posts:index"))
+        thumbnail = thumbnails.card_thumbnail(self.post, "card")
+        self.assertContains(response, f'src="{thumbnail["url"]}"')
+        self.assertNotContains(response, f'src="{self.post.image.url}"')
+
+    def test_cards_skip_kvstore(self):
+        """Карточки не ходят в kvstore sorl ни до, ни после построения."""
+
+        for _ in range(3):
+            Post.objects.create(
+                author=self.post.author, text="Еще", image=self.post.image.name
+            )
+        for built in (False, True):
+            if built:
+                for post in Post.objects.all():
+                    thumbnails.generate(post.pk, post.image.name)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("posts:index"))
+            with self.subTest(built=built):
+                self.assertFalse(
+                    [q for q in queries if "kvstore" in q["sql"]]
+                )
+
+    def test_worker_failure_logged(self):
+        """Ошибка в пуле потоков попадает в лог, а не теряется."""
+
+        future = Future()
+        future.set_exception(OSError("нет места"))
+        with self.assertLogs("posts.thumbnails", "ERROR") as logs:
+            thumbnails.log_failure(future)
+        self.assertIn("нет места", logs.output[0])
@@ -0,0 +1,144 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from core.tests.commit import run_commit_hooks
+from .. import timeline
+from ..models import Follow, Post, TimelineEntry, User
+
+AUTHOR = "auth"
+FOLLOWER = "follower"
+POST_TEXT = "Тестовый текст"
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.follower = User.objects.create_user(username=FOLLOWER)
+
+    def setUp(self) -> None:
+        Follow.objects.create(user=self.follower, author=self.author)
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+
+    def follow_page(self):
+        response = self.follower_client.get(reverse("posts:follow_index"))
+        return list(response.context["page_obj"])
+
+    def test_new_post_fan_out(self):
+        """Новый пост попадает в ленту подписчика."""
+
+        post = Post.objects.create(author=self.author, text=POST_TEXT)
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.follower, post=post
+            ).exists()
+        )
+        self.assertEqual(self.follow_page(), [post])
+
+    @override_settings(TIMELINE_DEPTH=2, TIMELINE_TRIM_SLACK=1)
+    def test_timeline_trimmed_to_depth(self):
+        """Раздача не обрезает ленту; команда обрезает переросшие."""
+
+        entries = TimelineEntry.objects.filter(user=self.follower)
+        for _ in range(3):
+            Post.objects.create(author=self.author, text=POST_TEXT)
+        call_command("trim_timelines", stdout=StringIO())
+        self.assertEqual(entries.count(), 3)
+        Post.objects.create(author=self.author, text=POST_TEXT)
+        call_command("trim_timelines", stdout=StringIO())
+        self.assertEqual(entries.count(), 2)
+
+    def test_fan_out_queries_do_not_grow_with_followers(self):
+        """Раздача поста - фиксированное число запросов на подписчиков."""
+
+        for i in range(5):
+            Follow.objects.create(
+                user=User.objects.create_user(username=f"reader{i}"),
+                author=self.author,
+            )
+        post = Post.objects.create(author=self.author, text=POST_TEXT)
+        # Проверка знаменитости, список подписчиков и одна вставка.
+        with self.assertNumQueries(3):
+            self.assertEqual(len(timeline.fan_out(post)), 6)
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=0)
+    def test_celebrity_posts_read_on_the_fly(self):
+        """Посты знаменитостей не раздаются, но видны в ленте."""
+
+        post = Post.objects.create(author=self.author, text=POST_TEXT)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.follow_page(), [post])
+
+    def test_unfollow_clears_timeline(self):
+        Post.objects.create(author=self.author, text=POST_TEXT)
+        Follow.objects.filter(user=self.follower).delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.follow_page(), [])
+
+    def test_rebuild_command(self):
+        post = Post.objects.create(author=self.author, text=POST_TEXT)
+        TimelineEntry.objects.all().delete()
+        call_command("rebuild_timelines", stdout=StringIO())
+        self.assertEqual(self.follow_page(), [post])
+
+    def test_entries_read_by_index(self):
+        """Записи ленты читаются по индексу без сортировки."""
+
+        paginator = timeline.TimelinePaginator(
+            Post.objects.all(), 10, self.follower, []
+        )
+        (keys,) = paginator.keys(limit=11)
+        plan = keys.explain()
+        self.assertIn("posts_timeline_user_date", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_celebrity_posts_merged_by_cursor(self):
+        """Записи ленты и посты знаменитостей сливаются без пропусков."""
+
+        star = User.objects.create_user(username="star")
+        Follow.objects.create(user=self.follower, author=star)
+        posts = []
+        for i in range(7):
+            author = star if i % 3 == 0 else self.author
+            posts.append(Post.objects.create(author=author, text=POST_TEXT))
+        expected = posts[::-1]
+
+        def page(cursor=None):
+            # Звезда стала знаменитостью, когда её посты уже разданы.
+            paginator = timeline.TimelinePaginator(
+                Post.objects.all(), 3, self.follower, [star.pk]
+            )
+            return list(paginator.get_page(cursor=cursor)), paginator
+
+        seen, cursor = [], None
+        while True:
+            rows, paginator = page(cursor)
+            seen.extend(rows)
+            if not paginator.has_next:
+                break
+            cursor = paginator.next_cursor
+        self.assertEqual(seen, expected)
+        rows, _ = page(paginator.previous_cursor)
+        self.assertEqual(rows, expected[3:6])
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=1)
+    def test_former_celebrity_backfilled(self):
+        """Посты, написанные в статусе знаменитости, раздаются после."""
+
+        reader = User.objects.create_user(username="reader")
+        Follow.objects.create(user=reader, author=self.author)
+        post = Post.objects.create(author=self.author, text=POST_TEXT)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        with run_commit_hooks():
+            Follow.objects.filter(user=reader).delete()
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.follower, post=post
+            ).exists()
+        )
+        self.assertEqual(self.follow_page(), [post])
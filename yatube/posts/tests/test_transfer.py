@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import Comment, Follow, Group, Post
+from ..seeding import Dataset, Seeder
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+DATASET = Dataset(users=10, groups=2, posts=30, comments=50, seed=5)
+
+
+def snapshot():
+    return (
+        list(Group.objects.order_by("pk").values()),
+        list(Post.objects.order_by("pk").values()),
+        list(Comment.objects.order_by("pk").values()),
+        list(Follow.objects.order_by("pk").values()),
+    )
+
+
+def clear():
+    Group.objects.all().delete()
+    Post.objects.all().delete()
+    Follow.objects.all().delete()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TransferTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        Seeder(DATASET).run()
+        # Даты из дампа должны пережить auto_now_add.
+        Post.objects.filter(pk=Post.objects.order_by("pk").first().pk).update(
+            pub_date="2001-01-01T00:00:00Z"
+        )
+
+    def call(self, *args, **options):
+        call_command(*args, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_round_trip(self):
+        """Экспорт и импорт сохраняют ключи, даты и пути картинок."""
+
+        for name in ("dump.ndjson", "dump.ndjson.gz"):
+            with self.subTest(dump=name):
+                path = os.path.join(self.directory, name)
+                self.call("export_posts", path, gzip=name.endswith(".gz"))
+                before = snapshot()
+                clear()
+                self.call("import_posts", path, batch_size=7)
+                self.assertEqual(snapshot(), before)
+
+    def test_import_resumes(self):
+        """Повторный импорт после обрыва догружает только недостающее."""
+
+        path = os.path.join(self.directory, "resume.ndjson")
+        self.call("export_posts", path)
+        before = snapshot()
+        clear()
+        with open(path, encoding="utf-8") as dump:
+            lines = dump.readlines()
+        partial = os.path.join(self.directory, "partial.ndjson")
+        with open(partial, "w", encoding="utf-8") as dump:
+            dump.writelines(lines[: len(lines) // 2])
+        self.call("import_posts", partial, skip_derived=True)
+        self.assertLess(Follow.objects.count(), len(before[3]))
+        self.call("import_posts", path)
+        self.assertEqual(snapshot(), before)
+        self.call("import_posts", path)
+        self.assertEqual(snapshot(), before)
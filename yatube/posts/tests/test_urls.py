@@ -30,6 +30,7 @@ class PostURLTest(TestCase):
             f"/profile/{cls.user}/": "posts/profile.html",
             f"/posts/{cls.post.pk}/": "posts/post_detail.html",
             "/group/test-slug/": "posts/group_list.html",
+            "/search/?q=текст": "posts/search.html",
         }
         cls.templates_private_urls_names = {
             "/create/": "posts/create_post.html",
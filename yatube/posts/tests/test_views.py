@@ -1,9 +1,12 @@
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 from django.core.cache import cache
+from django.db import connection
 
-from ..models import Follow, Post, Group, User
+from core.tests.commit import run_commit_hooks
+from ..models import Comment, Follow, Post, Group, User
 
 ALL_POSTS = 13
 POSTS_ON_1ST_PAGE = 10
@@ -192,6 +195,67 @@ class PaginatorViewsTest(TestCase):
                     len(response.context["page_obj"]), POSTS_ON_2ND_PAGE
                 )
 
+    def test_cursor_pages(self):
+        """Курсоры ведут на следующую и обратно на предыдущую страницу."""
+
+        reverse_names = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": GROUP_SLUG}),
+            reverse("posts:profile", kwargs={"username": AUTHOR}),
+        )
+        for reverse_name in reverse_names:
+            with self.subTest(reverse_name=reverse_name):
+                cache.clear()
+                response = self.authorized_client.get(reverse_name)
+                first_page = list(response.context["page_obj"])
+                paginator = response.context["page_obj"].paginator
+                self.assertFalse(paginator.has_previous)
+                response = self.authorized_client.get(
+                    reverse_name, {"cursor": paginator.next_cursor}
+                )
+                second_page = list(response.context["page_obj"])
+                paginator = response.context["page_obj"].paginator
+                self.assertEqual(len(second_page), POSTS_ON_2ND_PAGE)
+                self.assertFalse(set(first_page) & set(second_page))
+                self.assertFalse(paginator.has_next)
+                response = self.authorized_client.get(
+                    reverse_name, {"cursor": paginator.previous_cursor}
+                )
+                self.assertEqual(
+                    list(response.context["page_obj"]), first_page
+                )
+
+    def test_deep_page_number_capped(self):
+        """Глубокий ?page=N не читается через большой OFFSET."""
+
+        url = reverse("posts:index")
+        with self.settings(POSTS_MAX_PAGE_NUMBER=2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.authorized_client.get(url, {"page": 100000})
+        page_obj = response.context["page_obj"]
+        self.assertEqual(page_obj.number, 2)
+        self.assertEqual(len(page_obj), POSTS_ON_2ND_PAGE)
+        self.assertFalse(
+            any("OFFSET 999990" in query["sql"] for query in queries)
+        )
+
+    def test_feed_without_count_query(self):
+        """Лента не выполняет COUNT(*) по таблице постов."""
+
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(reverse("posts:index"))
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_broken_cursor_returns_first_page(self):
+        response = self.authorized_client.get(
+            reverse("posts:index"), {"cursor": "not-a-cursor"}
+        )
+        self.assertEqual(
+            len(response.context["page_obj"]), POSTS_ON_1ST_PAGE
+        )
+
 
 class CacheTest(TestCase):
     @classmethod
@@ -221,7 +285,9 @@ class CacheTest(TestCase):
         content = response.content
         context = response.context["page_obj"][0]
         self.assertEqual(context, self.test_post_cache)
-        self.test_post_cache.delete()
+        Post.objects.filter(pk=self.test_post_cache.pk).update(
+            text=POST_TEXT
+        )
         response = self.authorized_client.get(reverse("posts:index"))
         new_content = response.content
         self.assertEqual(content, new_content)
@@ -230,6 +296,40 @@ class CacheTest(TestCase):
         new_new_content = response.content
         self.assertNotEqual(content, new_new_content)
 
+    def test_cache_invalidated_by_events(self):
+        """Новый пост, комментарий и удаление сразу видны на index."""
+
+        self.authorized_client.get(reverse("posts:index"))
+        with run_commit_hooks():
+            post = Post.objects.create(author=self.user, text=POST_TEXT)
+        response = self.authorized_client.get(reverse("posts:index"))
+        self.assertContains(response, POST_TEXT)
+        with run_commit_hooks():
+            Comment.objects.create(post=post, author=self.user, text="Ком")
+        response = self.authorized_client.get(reverse("posts:index"))
+        self.assertContains(response, "Комментариев: 1")
+        with run_commit_hooks():
+            post.delete()
+        response = self.authorized_client.get(reverse("posts:index"))
+        self.assertNotContains(response, POST_TEXT)
+
+    def test_cards_follow_author_and_group_renames(self):
+        """Смена имени автора и названия группы видна в карточках."""
+
+        author = User.objects.create_user(username="writer", first_name="Ян")
+        group = Group.objects.create(title="Старая", slug="renamed")
+        Post.objects.create(author=author, group=group, text=POST_TEXT)
+        url = reverse("posts:index")
+        self.assertContains(self.authorized_client.get(url), "Старая")
+        author.first_name = "Олег"
+        group.title = "Новая"
+        with run_commit_hooks():
+            author.save()
+            group.save()
+        response = self.authorized_client.get(url)
+        self.assertContains(response, "Олег")
+        self.assertContains(response, "Новая")
+
 
 class FollowTest(TestCase):
     @classmethod
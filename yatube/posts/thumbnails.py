@@ -0,0 +1,116 @@
+"""Миниатюры картинок постов, которые готовятся вне запроса.
+
+После сохранения поста с картинкой миниатюры всех пресетов
+``POST_THUMBNAIL_PRESETS`` строятся в пуле потоков, а их имена пишутся в
+``Post.thumbnails``. Карточки берут адреса оттуда - без обращений к
+kvstore sorl - и до построения показывают исходную картинку, поэтому
+запрос никогда не открывает файл.
+"""
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import default, get_thumbnail
+
+from core.cache import pages
+from core.db.commit import invalidate
+from . import feed_cache
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.POST_THUMBNAIL_WORKERS,
+            thread_name_prefix="thumbnails",
+        )
+    return _executor
+
+
+def thumbnail_urls(post):
+    """Адреса построенных миниатюр поста по пресетам."""
+    try:
+        names = json.loads(post.thumbnails or "{}")
+    except ValueError:
+        # Испорченное поле - как непостроенные миниатюры: карточка
+        # покажет исходную картинку, schedule() перестроит их при правке.
+        return {}
+    storage = default.storage
+    return {preset: storage.url(name) for preset, name in names.items()}
+
+
+def card_thumbnail(post, preset):
+    """Адрес и размеры готовой миниатюры или None, пока она строится.
+
+    Пресеты режутся с ``crop`` и ``upscale``, поэтому размер миниатюры -
+    ровно геометрия пресета.
+    """
+    url = thumbnail_urls(post).get(preset)
+    if url is None:
+        return None
+    geometry, _ = settings.POST_THUMBNAIL_PRESETS[preset]
+    width, height = geometry.split("x")
+    return {"url": url, "width": width, "height": height}
+
+
+def generate(post_id, name):
+    """Строит миниатюры всех пресетов и обновляет карточку поста.
+
+    Имена готовых файлов сохраняются в ``Post.thumbnails``, чтобы API
+    отдавал адреса без обращений к хранилищу sorl.
+    """
+    names = {
+        preset: get_thumbnail(name, geometry, **options).name
+        for preset, (geometry, options) in (
+            settings.POST_THUMBNAIL_PRESETS.items()
+        )
+    }
+    # Картинку могли заменить, пока строились миниатюры.
+    Post.objects.filter(pk=post_id, image=name).update(
+        thumbnails=json.dumps(names)
+    )
+    # Строим уже после коммита: инвалидируем сразу и, при репликах,
+    # еще раз после их отставания.
+    invalidate(
+        feed_cache.bump, feed_cache.version_key(feed_cache.POST, post_id)
+    )
+    invalidate(pages.invalidate)
+
+
+def generate_in_worker(post_id, name):
+    try:
+        generate(post_id, name)
+    finally:
+        connections.close_all()
+
+
+def log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error(
+            "Не удалось построить миниатюры",
+            exc_info=(type(error), error, error.__traceback__),
+        )
+
+
+def schedule(post):
+    """Ставит построение миниатюр в очередь после коммита транзакции."""
+    if not post.image:
+        return
+    post_id, name = post.pk, post.image.name
+
+    def submit():
+        if settings.POST_THUMBNAILS_ASYNC:
+            future = executor().submit(generate_in_worker, post_id, name)
+            future.add_done_callback(log_failure)
+        else:
+            generate(post_id, name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,210 @@
+"""Лента подписок с раздачей при записи (fan-out-on-write).
+
+Новый пост копируется в ``TimelineEntry`` каждого подписчика автора, и
+``follow_index`` читает готовый список вместо join по ``posts_follow``.
+Посты «знаменитостей», у которых подписчиков больше
+``TIMELINE_CELEBRITY_THRESHOLD``, не раздаются, а подмешиваются при
+чтении (fan-out-on-read).
+
+Раздача не обрезает ленты: запись сверх ``TIMELINE_DEPTH`` читать не
+мешает, а лишние записи удаляет периодическая команда
+``trim_timelines`` у лент, переросших глубину на
+``TIMELINE_TRIM_SLACK``.
+
+Когда автор опускается до порога, его последние посты раздаются всем
+подписчикам, как при новой подписке: пока он был знаменитостью, они не
+попадали в ленты.
+"""
+import heapq
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .models import Follow, Post, TimelineEntry, UserStats
+from .paginators import CursorPaginator
+
+# Записей ленты в одном INSERT при раздаче старых постов.
+BACKFILL_BATCH = 5000
+
+
+def follower_ids(author_id):
+    return Follow.objects.filter(author_id=author_id).values_list(
+        "user_id", flat=True
+    )
+
+
+def is_celebrity(author_id):
+    threshold = settings.TIMELINE_CELEBRITY_THRESHOLD
+    return UserStats.objects.filter(
+        user_id=author_id, followers_count__gt=threshold
+    ).exists()
+
+
+def left_celebrities(author_id):
+    """Автор только что опустился до порога после отписки."""
+    return UserStats.objects.filter(
+        user_id=author_id,
+        followers_count=settings.TIMELINE_CELEBRITY_THRESHOLD,
+    ).exists()
+
+
+def celebrity_ids(user):
+    """Авторы из подписок пользователя, посты которых читаются на лету.
+
+    Число подписчиков берется из денормализованного ``UserStats``,
+    поэтому запрос не считает подписки авторов.
+    """
+    return list(
+        Follow.objects.filter(
+            user=user,
+            author__stats__followers_count__gt=(
+                settings.TIMELINE_CELEBRITY_THRESHOLD
+            ),
+        ).values_list("author_id", flat=True)
+    )
+
+
+def trim(user_id):
+    """Оставляет в ленте пользователя не больше TIMELINE_DEPTH записей."""
+    depth = settings.TIMELINE_DEPTH
+    entries = TimelineEntry.objects.filter(user_id=user_id)
+    boundary = list(
+        entries.order_by("-pub_date", "-post_id").values_list(
+            "pub_date", "post_id"
+        )[depth:depth + 1]
+    )
+    if boundary:
+        pub_date, post_id = boundary[0]
+        entries.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, post_id__lte=post_id)
+        ).delete()
+
+
+def overflowing_ids():
+    """Пользователи, чья лента длиннее глубины с запасом."""
+    limit = settings.TIMELINE_DEPTH + settings.TIMELINE_TRIM_SLACK
+    return (
+        TimelineEntry.objects.values("user_id")
+        .annotate(entries=Count("pk"))
+        .filter(entries__gt=limit)
+        .values_list("user_id", flat=True)
+    )
+
+
+def fan_out(post):
+    """Раздает новый пост в ленты подписчиков; возвращает их pk."""
+    if is_celebrity(post.author_id):
+        return []
+    user_ids = list(follower_ids(post.author_id))
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in user_ids
+        ],
+        ignore_conflicts=True,
+    )
+    return user_ids
+
+
+def add_author(user, author):
+    """Дописывает в ленту последние посты автора после подписки."""
+    if is_celebrity(author.pk):
+        return
+    posts = author.posts.order_by("-pub_date", "-pk").only("pub_date")
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user=user, post=post, pub_date=post.pub_date)
+            for post in posts[: settings.TIMELINE_DEPTH]
+        ],
+        ignore_conflicts=True,
+    )
+    trim(user.pk)
+
+
+def backfill_author(author_id):
+    """Раздает последние посты автора всем подписчикам; их pk."""
+    posts = list(
+        Post.objects.filter(author_id=author_id)
+        .order_by("-pub_date", "-pk")
+        .values_list("pk", "pub_date")[: settings.TIMELINE_DEPTH]
+    )
+    user_ids = list(follower_ids(author_id))
+    step = max(BACKFILL_BATCH // max(len(posts), 1), 1)
+    for start in range(0, len(user_ids), step):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+                for user_id in user_ids[start:start + step]
+                for pk, pub_date in posts
+            ],
+            ignore_conflicts=True,
+        )
+    return user_ids
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def rebuild(user):
+    """Пересобирает ленту пользователя целиком по текущим подпискам."""
+    TimelineEntry.objects.filter(user=user).delete()
+    posts = (
+        Post.objects.filter(author__following__user=user)
+        .exclude(author_id__in=celebrity_ids(user))
+        .order_by("-pub_date", "-pk")
+        .only("pub_date")
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user=user, post=post, pub_date=post.pub_date)
+            for post in posts[: settings.TIMELINE_DEPTH]
+        ]
+    )
+
+
+class TimelinePaginator(CursorPaginator):
+    """Лента подписок по курсору (pub_date, pk поста).
+
+    Записи ``TimelineEntry`` читаются по индексу (user, pub_date, post)
+    уже в порядке ленты, посты знаменитостей - по индексу автора. Обе
+    выборки ограничены размером страницы и сливаются в памяти, а посты
+    страницы загружаются из ``object_list`` одним запросом.
+    """
+
+    def __init__(self, object_list, per_page, user, celebrities, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        entries = TimelineEntry.objects.filter(user=user)
+        self.sources = [(entries, "post_id")]
+        if celebrities:
+            # Записи, разданные до того, как автор стал знаменитостью,
+            # повторили бы его посты из второй выборки.
+            entries = entries.exclude(post__author_id__in=celebrities)
+            self.sources = [
+                (entries, "post_id"),
+                (Post.objects.filter(author_id__in=celebrities), "pk"),
+            ]
+
+    def keys(self, after=None, forward=True, limit=None):
+        """Выборки пар (pub_date, pk поста) каждого источника."""
+        sign = "-" if forward == self.descending else ""
+        for queryset, pk_field in self.sources:
+            if after is not None:
+                queryset = queryset.filter(
+                    self._after(*after, forward, pk_field)
+                )
+            yield queryset.order_by(
+                f"{sign}{self.field}", f"{sign}{pk_field}"
+            ).values_list(self.field, pk_field)[:limit]
+
+    def fetch(self, after=None, forward=True, offset=0, limit=None):
+        keys = heapq.merge(
+            *self.keys(after, forward, offset + limit),
+            reverse=forward == self.descending,
+        )
+        post_ids = [pk for _, pk in list(keys)[offset:offset + limit]]
+        posts = self.object_list.in_bulk(post_ids)
+        return [posts[pk] for pk in post_ids if pk in posts]
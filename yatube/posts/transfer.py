@@ -0,0 +1,157 @@
+"""Потоковый экспорт и импорт постов в NDJSON.
+
+Одна строка - одна запись в формате ``dumpdata``: ``model``, ``pk`` и
+``fields``, внешние ключи - значениями pk, картинки - путями в
+хранилище. Таблицы читаются ``iterator(chunk_size=...)``, а импорт
+вставляет записи пачками, поэтому память не зависит от размера дампа.
+
+Импорт пропускает записи с уже существующими pk, так что прерванную
+загрузку достаточно запустить еще раз. Пользователи не выгружаются:
+авторы должны существовать в целевой базе с теми же pk, файлы
+картинок переносятся отдельно.
+"""
+import datetime
+import gzip
+import json
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .models import Comment, Follow, Group, Post
+
+# Порядок важен: сначала таблицы, на которые ссылаются остальные.
+MODELS = (Group, Post, Comment, Follow)
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class DumpEncoder(DjangoJSONEncoder):
+    """Даты с микросекундами: DjangoJSONEncoder режет их до миллисекунд."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def label(model):
+    return model._meta.label_lower
+
+
+def fields(model):
+    return [
+        field for field in model._meta.concrete_fields if not field.primary_key
+    ]
+
+
+def open_dump(path, mode, compress=False):
+    """Файл дампа; gzip по флагу при записи и по сигнатуре при чтении."""
+    if "r" in mode:
+        with open(path, "rb") as file:
+            compress = file.read(2) == GZIP_MAGIC
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def dump_rows(model, chunk_size=2000):
+    """Записи модели по возрастанию pk, без загрузки таблицы в память."""
+    columns = fields(model)
+    rows = (
+        model.objects.order_by("pk")
+        .values_list("pk", *(field.attname for field in columns))
+        .iterator(chunk_size=chunk_size)
+    )
+    for pk, *values in rows:
+        yield {
+            "model": label(model),
+            "pk": pk,
+            "fields": {
+                field.name: value for field, value in zip(columns, values)
+            },
+        }
+
+
+def export(stream, models=MODELS, chunk_size=2000):
+    """Пишет NDJSON в stream; возвращает число записей по моделям."""
+    exported = {}
+    for model in models:
+        exported[label(model)] = 0
+        for row in dump_rows(model, chunk_size):
+            line = json.dumps(row, cls=DumpEncoder, ensure_ascii=False)
+            stream.write(line + "\n")
+            exported[label(model)] += 1
+    return exported
+
+
+def build(model, row):
+    values = {
+        field.attname: field.to_python(row["fields"][field.name])
+        for field in fields(model)
+        if field.name in row["fields"]
+    }
+    return model(pk=row["pk"], **values)
+
+
+@contextmanager
+def dump_dates(model):
+    """Отключает auto_now и auto_now_add: даты берутся из дампа."""
+    changed = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in fields(model)
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    for field, _, _ in changed:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def insert(model, objs):
+    """Вставляет пачку как есть, пропуская уже существующие pk.
+
+    ``bulk_create`` не шлет сигналов, а ``pre_save`` на время вставки
+    не трогает даты - ``auto_now_add`` отключен.
+    """
+    batch_size = connection.ops.bulk_batch_size(fields(model), objs)
+    with transaction.atomic(), dump_dates(model):
+        model._base_manager.bulk_create(
+            objs, batch_size=batch_size, ignore_conflicts=True
+        )
+
+
+def load(stream, batch_size=1000):
+    """Читает NDJSON из stream; возвращает число записей по моделям."""
+    models = {label(model): model for model in MODELS}
+    loaded = {name: 0 for name in models}
+    model, batch = None, []
+    for line in stream:
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        current = models.get(row.get("model"))
+        if current is None:
+            raise ValueError(f"Неизвестная модель: {row.get('model')}")
+        if batch and (current is not model or len(batch) >= batch_size):
+            insert(model, batch)
+            batch = []
+        model = current
+        batch.append(build(model, row))
+        loaded[row["model"]] += 1
+    if batch:
+        insert(model, batch)
+    reset_sequences()
+    return loaded
+
+
+def reset_sequences():
+    """Сдвигает последовательности pk после вставки с явными ключами."""
+    statements = connection.ops.sequence_reset_sql(no_style(), MODELS)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 app_name = "posts"
 
@@ -8,7 +8,23 @@ urlpatterns = [
     path("", views.index, name="index"),
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
     path("profile/<str:username>/", views.profile, name="profile"),
+    path(
+        "profile/<str:username>/followers/",
+        views.profile_followers,
+        name="profile_followers",
+    ),
+    path(
+        "profile/<str:username>/following/",
+        views.profile_following,
+        name="profile_following",
+    ),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
+    path(
+        "posts/<int:post_id>/comments/",
+        views.post_comments,
+        name="post_comments",
+    ),
+    path("search/", views.search, name="search"),
     path("create/", views.post_create, name="post_create"),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
     path(
@@ -27,4 +43,28 @@ urlpatterns = [
         views.profile_unfollow,
         name="profile_unfollow",
     ),
+    path("events/", views.post_events, name="events"),
+    path(
+        "group/<slug:slug>/events/",
+        views.group_events,
+        name="group_events",
+    ),
+    path("follow/events/", views.follow_events, name="follow_events"),
+    path("api/v1/posts/", api.index, name="api_index"),
+    path(
+        "api/v1/groups/<slug:slug>/posts/",
+        api.group_posts,
+        name="api_group_list",
+    ),
+    path(
+        "api/v1/profiles/<str:username>/posts/",
+        api.profile,
+        name="api_profile",
+    ),
+    path(
+        "api/v1/posts/<int:post_id>/",
+        api.post_detail,
+        name="api_post_detail",
+    ),
+    path("api/v1/follow/", api.follow_index, name="api_follow_index"),
 ]
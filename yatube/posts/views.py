@@ -1,73 +1,253 @@
+import math
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render, get_object_or_404
+from django.urls import reverse
 
-from .models import Follow, Post, Group, get_user_model
+from core.db.routing import replica_reads
+from . import (
+    api,
+    events,
+    feed_cache,
+    follow_graph,
+    groups,
+    profiles,
+    thumbnails,
+)
+from .models import Follow, Post
+from .comments import comments_page
+from .conditional import render_conditional
+from .counters import user_stats
 from .forms import PostForm, CommentForm
+from .paginators import CursorPaginator
+from .search import SearchPaginator
+from .timeline import TimelinePaginator, celebrity_ids
 
 POSTS_ON_PAGE = 10
+USERS_ON_PAGE = 30
+
+
+def get_paginator_page(
+    request, query_set, paginator_class=CursorPaginator, **kwargs
+):
+    paginator = paginator_class(
+        query_set,
+        POSTS_ON_PAGE,
+        max_page=settings.POSTS_MAX_PAGE_NUMBER,
+        **kwargs,
+    )
+    return paginator.get_page(
+        request.GET.get("page"),
+        cursor=request.GET.get("cursor"),
+    )
 
-User = get_user_model()
 
+def stats_state(stats):
+    return stats.posts_count, stats.followers_count, stats.following_count
 
-def get_paginator_page(request, query_set):
-    paginator = Paginator(query_set, POSTS_ON_PAGE)
-    page_number = request.GET.get("page")
-    return paginator.get_page(page_number)
 
+def mark_following(request, page_obj):
+    """Отмечает посты авторов, на которых подписан читатель.
 
+    Возвращает строку с pk этих авторов для ключа кэша и ETag.
+    """
+    followed = set()
+    if request.user.is_authenticated:
+        followed = follow_graph.following_among(
+            request.user.pk, {post.author_id for post in page_obj}
+        )
+    for post in page_obj:
+        post.author_followed = post.author_id in followed
+    return ",".join(map(str, sorted(followed)))
+
+
+@replica_reads
 def index(request):
-    posts = Post.objects.select_related("group", "author").all()
+    posts = Post.objects.for_feed()
     page_obj = get_paginator_page(request, posts)
     context = {
         "page_obj": page_obj,
+        "page_version": feed_cache.page_version(
+            page_obj, feed_cache.version_key(feed_cache.GLOBAL)
+        ),
         "index": "index",
+        "follow_state": mark_following(request, page_obj),
+        "live_feed": live_feed(request),
     }
-    return render(request, "posts/index.html", context)
+    return render_conditional(
+        request,
+        "posts/index.html",
+        context,
+        [context["page_version"], context["follow_state"]],
+    )
 
 
+@replica_reads
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = groups.get_or_404(slug)
+    posts = group.posts.for_feed()
     page_obj = get_paginator_page(request, posts)
     context = {
         "group": group,
         "page_obj": page_obj,
+        "page_version": feed_cache.page_version(
+            page_obj, feed_cache.version_key(feed_cache.GROUP, group.pk)
+        ),
+        "follow_state": mark_following(request, page_obj),
+        "live_feed": live_feed(request),
     }
-    return render(request, "posts/group_list.html", context)
+    return render_conditional(
+        request,
+        "posts/group_list.html",
+        context,
+        [context["page_version"], context["follow_state"]],
+    )
 
 
+@replica_reads
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
+    author = profiles.get_or_404(username)
+    posts = author.posts.for_author_feed()
     page_obj = get_paginator_page(request, posts)
     user = request.user
     following = (
         user.is_authenticated
         and author != user
-        and Follow.objects.filter(user=user, author=author).exists()
+        and follow_graph.is_following(user.pk, author.pk)
     )
+    stats = user_stats(author)
     context = {
         "author": author,
+        "author_stats": stats,
         "page_obj": page_obj,
+        "page_version": feed_cache.page_version(
+            page_obj, feed_cache.version_key(feed_cache.AUTHOR, author.pk)
+        ),
         "following": following,
     }
-    return render(request, "posts/profile.html", context)
+    return render_conditional(
+        request,
+        "posts/profile.html",
+        context,
+        [context["page_version"], *stats_state(stats), following],
+    )
 
 
+def follow_list(request, author, follows, relation, title, total):
+    """Пользователи из подписок по курсору pk, без COUNT и OFFSET.
+
+    Общее число берется из денормализованных счетчиков автора.
+    """
+    follows = follows.select_related(relation).only(
+        *(f"{relation}__{name}" for name in profiles.FIELDS[1:])
+    )
+    paginator = CursorPaginator(follows, USERS_ON_PAGE, field="pk")
+    page_obj = paginator.get_page(cursor=request.GET.get("cursor"))
+    context = {
+        "author": author,
+        "title": title,
+        "total": total,
+        "page_obj": page_obj,
+        "users": [getattr(follow, relation) for follow in page_obj],
+    }
+    return render(request, "posts/follow_list.html", context)
+
+
+@replica_reads
+def profile_followers(request, username):
+    author = profiles.get_or_404(username)
+    return follow_list(
+        request,
+        author,
+        Follow.objects.filter(author=author),
+        "user",
+        "Подписчики",
+        user_stats(author).followers_count,
+    )
+
+
+@replica_reads
+def profile_following(request, username):
+    author = profiles.get_or_404(username)
+    return follow_list(
+        request,
+        author,
+        Follow.objects.filter(user=author),
+        "author",
+        "Подписки",
+        user_stats(author).following_count,
+    )
+
+
+@replica_reads
 def post_detail(request, post_id):
     form = CommentForm()
-    post = get_object_or_404(Post, id=post_id)
-    comments = post.comments.all()
+    post = get_object_or_404(Post.objects.for_feed(), id=post_id)
+    comments, next_cursor = comments_page(post.pk, request.GET.get("cursor"))
+    stats = user_stats(post.author)
     context = {
         "post": post,
+        "post_id": post.pk,
+        "author_stats": stats,
         "form": form,
         "comments": comments,
+        "next_cursor": next_cursor,
+    }
+    versions = feed_cache.get_versions(
+        [
+            *feed_cache.card_keys(post),
+            feed_cache.version_key(feed_cache.COMMENTS, post.pk),
+        ]
+    )
+    return render_conditional(
+        request,
+        "posts/post_detail.html",
+        context,
+        [*sorted(versions.values()), *stats_state(stats)],
+    )
+
+
+@replica_reads
+def post_comments(request, post_id):
+    """Следующая страница комментариев: HTML-фрагмент или JSON."""
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    comments, next_cursor = comments_page(post_id, request.GET.get("cursor"))
+    if request.GET.get("format") != "json":
+        context = {
+            "post_id": post_id,
+            "comments": comments,
+            "next_cursor": next_cursor,
+        }
+        return render(request, "posts/includes/comments.html", context)
+    next_url = None
+    if next_cursor:
+        next_url = "{}?format=json&cursor={}".format(
+            reverse("posts:post_comments", args=[post_id]), next_cursor
+        )
+    return JsonResponse(
+        {
+            "comments": [api.comment_data(comment) for comment in comments],
+            "next": next_url,
+        }
+    )
+
+
+def search(request):
+    query = request.GET.get("q", "").strip()
+    paginator = SearchPaginator(query, POSTS_ON_PAGE)
+    context = {
+        "query": query,
+        "page_obj": paginator.get_page(request.GET.get("cursor")),
     }
-    return render(request, "posts/post_detail.html", context)
+    return render(request, "posts/search.html", context)
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     template = "posts/create_post.html"
     form = PostForm(
@@ -79,6 +259,7 @@ def post_create(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    thumbnails.schedule(post)
     return redirect("posts:profile", username=post.author)
 
 
@@ -101,11 +282,24 @@ def post_edit(request, post_id):
         }
         return render(request, template, context)
     post = form.save(commit=False)
-    post.save(update_fields=["text", "group", "image"])
+    post.save(
+        update_fields=[
+            "text",
+            "group",
+            "image",
+            "image_width",
+            "image_height",
+            "image_hash",
+            "thumbnails",
+        ]
+    )
+    if "image" in form.changed_data:
+        thumbnails.schedule(post)
     return redirect("posts:post_detail", post_id)
 
 
 @login_required
+@transaction.atomic
 def comment_added(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
@@ -118,26 +312,34 @@ def comment_added(request, post_id):
 
 
 @login_required
+@replica_reads
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    page_obj = get_paginator_page(request, posts)
+    celebrities = celebrity_ids(request.user)
+    page_obj = get_paginator_page(
+        request,
+        Post.objects.for_feed(),
+        TimelinePaginator,
+        user=request.user,
+        celebrities=celebrities,
+    )
     context = {
         "page_obj": page_obj,
+        "page_version": feed_cache.page_version(
+            page_obj, *feed_cache.follow_feed_keys(request.user, celebrities)
+        ),
         "follow": "follow",
+        "live_feed": live_feed(request),
     }
 
     return render(request, "posts/follow.html", context)
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
-    following = Follow.objects.filter(
-        user=request.user,
-        author=author,
-    )
-    if request.user != author and not following.exists():
-        Follow.objects.create(
+    author = profiles.get_or_404(username)
+    if request.user != author:
+        Follow.objects.get_or_create(
             user=request.user,
             author=author,
         )
@@ -145,8 +347,74 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     user = request.user
-    author = get_object_or_404(User, username=username)
+    author = profiles.get_or_404(username)
     Follow.objects.filter(author=author, user=user).delete()
     return redirect("posts:profile", username=author)
+
+
+def live_feed(request):
+    """Открывать ли на странице поток новых постов (POSTS_LIVE_FEED)."""
+    return settings.POSTS_LIVE_FEED and request.user.is_authenticated
+
+
+def stream_duration(request):
+    """``?timeout`` в пределах [0, EVENTS_STREAM_SECONDS].
+
+    ``nan`` проходит ``float()`` и ломает сравнение со сроком: поток
+    никогда бы не закончился.
+    """
+    limit = settings.EVENTS_STREAM_SECONDS
+    try:
+        timeout = float(request.GET["timeout"])
+    except (KeyError, ValueError):
+        return limit
+    if not math.isfinite(timeout):
+        return limit
+    return min(max(timeout, 0), limit)
+
+
+def event_stream(request, channels):
+    """Поток SSE с id новых постов каналов; переподключение по курсору."""
+    if not settings.POSTS_LIVE_FEED:
+        raise Http404("Живая лента выключена")
+    try:
+        after = int(
+            request.META.get("HTTP_LAST_EVENT_ID")
+            or request.GET["last_id"]
+        )
+    except (KeyError, ValueError):
+        after = events.get_bus().last_id()
+    response = StreamingHttpResponse(
+        events.stream(channels, after, stream_duration(request)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # nginx не должен копить поток в буфере.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def post_events(request):
+    return event_stream(request, [events.channel(events.GLOBAL)])
+
+
+@login_required
+@replica_reads
+def group_events(request, slug):
+    group = groups.get_or_404(slug)
+    return event_stream(request, [events.channel(events.GROUP, group.pk)])
+
+
+@login_required
+@replica_reads
+def follow_events(request):
+    author_ids = Follow.objects.filter(user=request.user).values_list(
+        "author_id", flat=True
+    )
+    return event_stream(
+        request, [events.channel(events.AUTHOR, pk) for pk in author_ids]
+    )
@@ -57,11 +57,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.metrics.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.cache.pages.AnonymousPageCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.db.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
@@ -72,7 +75,7 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "core.metrics.templates.DjangoTemplates",
         "DIRS": [TEMPLATES_DIR],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -100,6 +103,25 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения лент. Локально вторая SQLite-база задается через
+# YATUBE_REPLICA_DB; её наполняет внешняя репликация (или копия файла).
+if os.getenv("YATUBE_REPLICA_DB"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("YATUBE_REPLICA_DB"),
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["core.db.routing.ReplicaRouter"]
+# Сколько секунд после записи клиент читает только из основной базы.
+REPLICA_STICKY_SECONDS = 10
+
+# Метрики представлений этих приложений отдаются на /metrics/ только
+# с заголовком "Authorization: Bearer <METRICS_TOKEN>" (bearer_token в
+# Prometheus). За прокси REMOTE_ADDR всегда локальный, поэтому адресу не
+# верим; без токена эндпоинт выключен.
+METRICS_NAMESPACES = ("posts", "users", "about")
+METRICS_TOKEN = os.getenv("YATUBE_METRICS_TOKEN", "")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -149,8 +171,75 @@ LOGIN_URL = "users:login"
 LOGIN_REDIRECT_URL = "posts:index"
 LOGOUT_URL = "users:logout"
 
-EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+# Письма сначала попадают в очередь в базе, а отправляет их команда
+# send_outbox через OUTBOX_EMAIL_BACKEND.
+EMAIL_BACKEND = "core.mail.backends.OutboxBackend"
+OUTBOX_EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+if os.getenv("YATUBE_EMAIL_HOST"):
+    OUTBOX_EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    EMAIL_HOST = os.environ["YATUBE_EMAIL_HOST"]
+    EMAIL_PORT = int(os.getenv("YATUBE_EMAIL_PORT", "25"))
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_SECONDS = 60
+OUTBOX_LEASE_SECONDS = 300
+
+# Старые ссылки ?page=N читаются через OFFSET; номера глубже этого
+# урезаются, дальше лента листается по курсору.
+POSTS_MAX_PAGE_NUMBER = 10
+
+# Комментариев на странице поста и в каждой догружаемой порции.
+COMMENTS_ON_PAGE = 20
+
+# Лента подписок: сколько записей хранить на пользователя и с какого
+# числа подписчиков посты автора подмешиваются при чтении.
+TIMELINE_DEPTH = 800
+TIMELINE_CELEBRITY_THRESHOLD = 10000
+# Запас сверх глубины, после которого trim_timelines обрезает ленту.
+TIMELINE_TRIM_SLACK = 200
+
+# Подписки пользователя кэшируются массивом pk, пока их не больше лимита.
+FOLLOW_GRAPH_CACHE_LIMIT = 50000
+
+# Миниатюры картинок постов строятся в фоне по этим пресетам
+# (геометрия и опции sorl-thumbnail).
+POST_THUMBNAIL_PRESETS = {
+    "card": ("960x339", {"crop": "center", "upscale": True}),
+    "small": ("320x113", {"crop": "center", "upscale": True}),
+}
+# Миниатюры строятся в пуле потоков после коммита; False - сразу в
+# on_commit (тесты, которым нужен готовый файл до конца запроса).
+POST_THUMBNAILS_ASYNC = True
+POST_THUMBNAIL_WORKERS = 2
+
+# Загруженные картинки перекодируются: без метаданных, не больше
+# POST_IMAGE_MAX_SIZE, в формате POST_IMAGE_FORMAT с заданным качеством.
+POST_IMAGE_MAX_SIZE = (1920, 1920)
+POST_IMAGE_MAX_PIXELS = 50_000_000
+POST_IMAGE_FORMAT = "WEBP"
+POST_IMAGE_QUALITY = 80
+
+# Поисковый индекс постов: FTS5 для SQLite или posts.search.LikeBackend
+# для СУБД без него.
+POSTS_SEARCH_BACKEND = "posts.search.SqliteFtsBackend"
+
+# Входит в ETag страниц: новый релиз с другими шаблонами не должен
+# получать 304 на старую разметку.
+PAGE_ETAG_SALT = os.getenv("YATUBE_RELEASE", "")
+
+# Страницы для гостей целиком из кэша до нового или измененного поста
+# либо комментария; CDN держит их PAGE_CACHE_EDGE_SECONDS.
+PAGE_CACHE_VIEWS = ("posts:index", "posts:group_list")
+PAGE_CACHE_SECONDS = 300
+PAGE_CACHE_EDGE_SECONDS = 10
+
+# Шина событий о новых постах для потоков SSE. Поток занимает поток
+# воркера на EVENTS_STREAM_SECONDS, после чего клиент переподключается:
+# нужны потоковые воркеры (gthread, gevent), а не sync. Поэтому живая
+# лента выключена по умолчанию и даже включенная - только для вошедших.
+POSTS_LIVE_FEED = False
+POSTS_EVENT_BUS = "posts.events.MemoryBus"
+EVENTS_STREAM_SECONDS = 30
 
 CSRF_COOKIE_SECURE = True
 CSRF_FAILURE_VIEW = "core.views.csrf_failure"
@@ -158,6 +247,19 @@ CSRF_FAILURE_VIEW = "core.views.csrf_failure"
 
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "BACKEND": "core.metrics.cache.LocMemCache",
     }
 }
+
+# Общий Redis-совместимый кэш для всех воркеров, например
+# YATUBE_CACHE_URL=redis://127.0.0.1:6379/0
+if os.environ.get("YATUBE_CACHE_URL"):
+    CACHES["default"] = {
+        "BACKEND": "core.metrics.cache.RedisCache",
+        "LOCATION": os.environ["YATUBE_CACHE_URL"],
+        "OPTIONS": {
+            "MAX_CONNECTIONS": 50,
+            "SOCKET_TIMEOUT": 1,
+        },
+    }
+    POSTS_EVENT_BUS = "posts.events.CacheBus"
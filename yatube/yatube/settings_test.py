@@ -0,0 +1,17 @@
+"""Настройки тестов: вторая SQLite-база для чтения с реплики.
+
+Ленты читают её, только если тест включит ``DATABASE_REPLICAS``.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+DATABASES = dict(DATABASES)
+DATABASES.setdefault(
+    "replica",
+    {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BASE_DIR, "db-replica.sqlite3"),
+    },
+)
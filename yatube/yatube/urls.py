@@ -18,12 +18,15 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from core.metrics.views import metrics
+
 urlpatterns = [
     path("", include("posts.urls", namespace="posts")),
     path("auth/", include("users.urls", namespace="users")),
     path("admin/", admin.site.urls),
     path("auth/", include("django.contrib.auth.urls")),
     path("about/", include("about.urls", namespace="about")),
+    path("metrics/", metrics, name="metrics"),
 ]
 handler404 = "core.views.page_not_found"
 handler500 = "core.views.server_error"